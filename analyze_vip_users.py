@@ -7,14 +7,96 @@
 import sys
 import io
 
-# 强制UTF-8输出
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
-
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from pyarrow import compute as pc
 import glob
+import os
+import pickle
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# 快照TSV列名（文件无表头）
+SNAPSHOT_COLUMNS = ['contract', 'chain', 'token_or_holder', 'holder_or_asset']
+
+# 已解析快照的缓存文件（按TSV修改时间失效）
+SNAPSHOT_CACHE_FILE = 'vip_snapshot_cache.pkl'
+
+# 交易缓存中分析所需的列及其类型
+TRANSACTION_COLUMNS = ['DateTime', 'Amount', 'Asset', 'Chain', 'TxHash', 'From', 'Direction']
+# 低基数的 Asset/Chain/Direction 使用 category，过滤时按整数编码比较
+TRANSACTION_DTYPES = {
+    'Amount': 'float64',
+    'Asset': 'category',
+    'Chain': 'category',
+    'TxHash': str,
+    'From': str,
+    'Direction': 'category'
+}
+
+# 从文件名解析周数，如 "nft-owners-1st week.tsv"
+WEEK_PATTERN = re.compile(r'(\d+)(?:st|nd|rd|th)\s+week')
+
+# 报表金额统一保留两位小数（在输出时格式化，不再单独round一遍）
+REPORT_FLOAT_FORMAT = '{:.2f}'.format
+
+def read_snapshot_tsv(file):
+    """使用PyArrow多线程解析快照TSV，所有列按字符串读取"""
+    table = pacsv.read_csv(
+        file,
+        read_options=pacsv.ReadOptions(column_names=SNAPSHOT_COLUMNS),
+        # 列数不完整的行（如被锁定的NFT没有持有者）直接跳过
+        parse_options=pacsv.ParseOptions(delimiter='\t', invalid_row_handler=lambda row: 'skip'),
+        convert_options=pacsv.ConvertOptions(
+            column_types={col: pa.string() for col in SNAPSHOT_COLUMNS},
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas()
+
+def parse_snapshot_file(file):
+    """解析单个快照TSV，返回 {'evm': set(), 'solana': set()}"""
+    df = read_snapshot_tsv(file)
+    
+    # 跳过空值行
+    df = df.dropna(subset=['chain', 'holder_or_asset'])
+    chain = df['chain'].str.lower().str.strip()
+    holder = df['holder_or_asset'].str.strip()
+    
+    # Solana链：第4列是holder地址
+    sol_holders = holder[chain == 'sol']
+    
+    # EVM链：第4列是holder地址
+    evm_holders = holder[chain.isin(['pol', 'bnb', 'eth'])].str.lower()
+    evm_valid = evm_holders.str.startswith('0x') & (evm_holders.str.len() == 42)
+    
+    return {
+        'evm': set(evm_holders[evm_valid]),
+        'solana': set(sol_holders[sol_holders.str.len() > 20])
+    }
+
+def load_snapshot_cache():
+    """读取已解析的快照缓存：{文件名: {'mtime': float, 'evm': set(), 'solana': set()}}"""
+    if not os.path.exists(SNAPSHOT_CACHE_FILE):
+        return {}
+    try:
+        with open(SNAPSHOT_CACHE_FILE, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"  ⚠️  读取快照缓存失败，将重新解析: {e}")
+        return {}
+
+def save_snapshot_cache(cache):
+    """保存已解析的快照缓存"""
+    try:
+        with open(SNAPSHOT_CACHE_FILE, 'wb') as f:
+            pickle.dump(cache, f)
+    except Exception as e:
+        print(f"  ⚠️  保存快照缓存失败: {e}")
+
 def load_vip_users():
     """加载所有周的特权用户名单，返回每周快照的地址集合"""
     print("正在加载特权用户名单（按周快照）...")
@@ -26,45 +108,48 @@ def load_vip_users():
     tsv_files = glob.glob('nft-owners-*.tsv')
     print(f"找到 {len(tsv_files)} 个TSV文件")
     
-    # 解析周数
-    import re
-    week_pattern = re.compile(r'(\d+)(st|nd|rd|th)\s+week')
+    # 先按文件名提取周数，过滤掉不符合命名的文件，并按周数（而非字符串）排序
+    week_files = sorted(
+        (int(match.group(1)), file)
+        for file in tsv_files
+        if (match := WEEK_PATTERN.search(file))
+    )
+    
+    # 快照文件每周新增、历史文件不变，只重新解析修改时间变化的文件
+    snapshot_cache = load_snapshot_cache()
+    updated_cache = {}
+    file_mtimes = {file: os.path.getmtime(file) for _, file in week_files}
+    stale_files = [
+        file for _, file in week_files
+        if snapshot_cache.get(file, {}).get('mtime') != file_mtimes[file]
+    ]
     
-    for file in sorted(tsv_files):
-        # 提取周数
-        match = week_pattern.search(file)
-        if not match:
-            continue
-        week_num = int(match.group(1))
-        
-        print(f"  读取第{week_num}周快照: {file}...")
-        
+    # 各文件相互独立，并行解析（PyArrow解析时释放GIL，线程即可跑满多核）
+    with ThreadPoolExecutor() as executor:
+        futures = {file: executor.submit(parse_snapshot_file, file) for file in stale_files}
+    
+    for week_num, file in week_files:
         if week_num not in weekly_snapshots:
             weekly_snapshots[week_num] = {'evm': set(), 'solana': set()}
         
-        try:
-            # 读取TSV文件，无表头
-            df = pd.read_csv(file, sep='\t', header=None, names=['contract', 'chain', 'token_or_holder', 'holder_or_asset'])
-            
-            for _, row in df.iterrows():
-                # 检查是否有空值
-                if pd.isna(row['chain']) or pd.isna(row['holder_or_asset']):
-                    continue
-                    
-                chain = str(row['chain']).lower().strip()
-                
-                if chain == 'sol':
-                    # Solana链：第4列是holder地址
-                    holder = str(row['holder_or_asset']).strip()
-                    if len(holder) > 20:
-                        weekly_snapshots[week_num]['solana'].add(holder)
-                elif chain in ['pol', 'bnb', 'eth']:
-                    # EVM链：第4列是holder地址
-                    holder = str(row['holder_or_asset']).strip().lower()
-                    if holder.startswith('0x') and len(holder) == 42:
-                        weekly_snapshots[week_num]['evm'].add(holder)
-        except Exception as e:
-            print(f"  ⚠️  读取 {file} 时出错: {e}")
+        if file in futures:
+            print(f"  读取第{week_num}周快照: {file}...")
+            try:
+                snapshot = futures[file].result()
+            except Exception as e:
+                print(f"  ⚠️  读取 {file} 时出错: {e}")
+                continue
+            snapshot['mtime'] = file_mtimes[file]
+        else:
+            print(f"  使用第{week_num}周快照缓存: {file}")
+            snapshot = snapshot_cache[file]
+        
+        updated_cache[file] = snapshot
+        weekly_snapshots[week_num]['evm'].update(snapshot['evm'])
+        weekly_snapshots[week_num]['solana'].update(snapshot['solana'])
+    
+    if updated_cache != snapshot_cache:
+        save_snapshot_cache(updated_cache)
     
     # 统计总数（去重）
     all_evm = set()
@@ -81,20 +166,47 @@ def load_vip_users():
     
     return weekly_snapshots, all_evm, all_solana
 
+def lowercase_addresses(addresses):
+    """地址转小写并去空格：只处理去重后的地址，再按编码映射回每一行"""
+    codes, uniques = pd.factorize(addresses)
+    # 末尾追加NaN，缺失值的编码 -1 正好映射到它
+    lookup = np.append(pd.Index(uniques).str.lower().str.strip().to_numpy(dtype=object), np.nan)
+    return pd.Series(lookup[codes], index=addresses.index)
+
+def fast_isin(series, values):
+    """成员判断：用PyArrow在C++中构建哈希表并探测，替代逐个字符串哈希的 Series.isin"""
+    value_set = pa.array(list(values), type=pa.string())
+    arr = pa.array(series.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    # 缺失地址不在名单中，判为False
+    mask = pc.is_in(arr, value_set=value_set).fill_null(False)
+    return pd.Series(mask.to_numpy(zero_copy_only=False), index=series.index)
+
 def load_transaction_data():
     """加载GMT Pay交易数据"""
     print("正在加载GMT Pay交易数据...")
     
     cache_file = 'chain_data_cache.csv'
+    parquet_file = 'chain_data_cache.parquet'
     try:
-        df = pd.read_csv(cache_file)
+        # 优先读取Parquet缓存（列式、带类型，无需解析文本）；仅当它不比CSV旧时使用
+        if os.path.exists(parquet_file) and (
+            not os.path.exists(cache_file)
+            or os.path.getmtime(parquet_file) >= os.path.getmtime(cache_file)
+        ):
+            df = pd.read_parquet(parquet_file, columns=TRANSACTION_COLUMNS)
+            df = df.astype({col: dtype for col, dtype in TRANSACTION_DTYPES.items() if dtype == 'category'})
+        else:
+            # 只读取分析需要的列，并显式指定类型以跳过类型推断
+            df = pd.read_csv(
+                cache_file,
+                encoding='utf-8-sig',
+                usecols=TRANSACTION_COLUMNS,
+                dtype=TRANSACTION_DTYPES,
+                parse_dates=['DateTime']
+            )
         
         # 标准化地址格式
-        df['From_Lower'] = df['From'].str.lower().str.strip()
-        
-        # 确保DateTime是datetime类型
-        df['DateTime'] = pd.to_datetime(df['DateTime'])
-        df['Date'] = df['DateTime'].dt.date
+        df['From_Lower'] = lowercase_addresses(df['From'])
         
         print(f"✅ 加载 {len(df)} 条交易记录\n")
         return df
@@ -102,35 +214,39 @@ def load_transaction_data():
         print(f"❌ 加载交易数据失败: {e}")
         return pd.DataFrame()
 
-def determine_card_value(amount):
-    """根据支付金额确定卡片面值"""
-    CARD_DENOMINATIONS = {
-        '25 USD': {'min': 24.5, 'max': 27, 'value': 25},
-        '50 USD': {'min': 48, 'max': 54, 'value': 50},
-        '100 USD': {'min': 98, 'max': 107, 'value': 100},
-        '200 USD': {'min': 195, 'max': 212, 'value': 200},
-        '300 USD': {'min': 295, 'max': 318, 'value': 300}
-    }
-    
-    for card_name, range_info in CARD_DENOMINATIONS.items():
-        if range_info['min'] <= amount <= range_info['max']:
-            return range_info['value']
-    return 0
+# 卡片面值区间（闭区间 [min, max]，按下限升序排列）
+CARD_DENOMINATIONS = {
+    '25 USD': {'min': 24.5, 'max': 27, 'value': 25},
+    '50 USD': {'min': 48, 'max': 54, 'value': 50},
+    '100 USD': {'min': 98, 'max': 107, 'value': 100},
+    '200 USD': {'min': 195, 'max': 212, 'value': 200},
+    '300 USD': {'min': 295, 'max': 318, 'value': 300}
+}
+CARD_VALUE_MINS = np.array([d['min'] for d in CARD_DENOMINATIONS.values()], dtype=float)
+CARD_VALUE_MAXS = np.array([d['max'] for d in CARD_DENOMINATIONS.values()], dtype=float)
+CARD_VALUES = np.array([d['value'] for d in CARD_DENOMINATIONS.values()], dtype=np.int64)
+
+def determine_card_value(amounts):
+    """根据支付金额确定卡片面值（向量化分桶，无法识别的金额返回0）"""
+    amounts = np.asarray(amounts, dtype=float)
+    # 找到下限不大于金额的最后一个区间，再检查是否落在该区间上限内
+    idx = np.searchsorted(CARD_VALUE_MINS, amounts, side='right') - 1
+    safe_idx = idx.clip(min=0)
+    in_range = (idx >= 0) & (amounts <= CARD_VALUE_MAXS[safe_idx])
+    return np.where(in_range, CARD_VALUES[safe_idx], 0)
 
 def get_snapshot_week_for_datetime(dt):
-    """根据交易时间判断属于哪一周的快照有效期"""
+    """根据交易时间判断属于哪一周的快照有效期（向量化，输入为datetime Series）"""
     # 首次快照：2025-07-21 08:00 UTC
     # 每周快照一次，有效期7天
-    first_snapshot = pd.to_datetime('2025-07-21 08:00:00')
-    
-    if dt < first_snapshot:
-        return 0  # 活动前
+    first_snapshot = pd.Timestamp('2025-07-21 08:00:00')
     
-    # 计算距离首次快照的天数
-    days_diff = (dt - first_snapshot).total_seconds() / 86400
-    week_num = int(days_diff // 7) + 1  # 第几周
+    # 计算距离首次快照的秒数，按7天分桶得到第几周
+    seconds_diff = (dt - first_snapshot).dt.total_seconds()
+    week_num = (seconds_diff // (7 * 86400)).astype('int64') + 1
     
-    return week_num
+    # 活动前记为第0周
+    return week_num.where(dt >= first_snapshot, 0)
 
 def analyze_vip_purchases():
     """分析特权用户的购卡情况"""
@@ -148,51 +264,50 @@ def analyze_vip_purchases():
     # 3. 筛选出特权用户的交易
     print("正在匹配特权用户的购卡记录...")
     
+    chain = df_tx['Chain']
+    
     # EVM链交易（Ethereum, BNB Chain, Polygon）
     evm_chains = ['Ethereum', 'BNB Chain', 'Polygon']
-    df_evm_vip = df_tx[
-        (df_tx['Chain'].isin(evm_chains)) & 
-        (df_tx['From_Lower'].isin(evm_addresses))
-    ].copy()
+    mask_evm = chain.isin(evm_chains) & fast_isin(df_tx['From_Lower'], evm_addresses)
     
     # Solana链交易
-    df_sol_vip = df_tx[
-        (df_tx['Chain'] == 'Solana') & 
-        (df_tx['From'].isin(solana_addresses))
-    ].copy()
-    
-    # 合并所有特权用户的交易
-    df_vip = pd.concat([df_evm_vip, df_sol_vip], ignore_index=True)
+    mask_sol = (chain == 'Solana') & fast_isin(df_tx['From'], solana_addresses)
     
-    # 只保留inflow交易（转入交易）
-    df_vip = df_vip[df_vip['Direction'] == 'inflow'].copy()
-    
-    # 只保留使用支持代币的交易（USDC, USDT, GGUSD）
+    # 只保留inflow交易（转入交易），且使用支持代币（USDC, USDT, GGUSD）
     supported_tokens = ['USDC', 'USDT', 'GGUSD']
-    df_vip = df_vip[df_vip['Asset'].isin(supported_tokens)].copy()
+    mask = (mask_evm | mask_sol) & (df_tx['Direction'] == 'inflow') & df_tx['Asset'].isin(supported_tokens)
+    
+    # 合并为一个掩码只复制一次，不再分别复制EVM/Solana子表再拼接
+    df_vip = df_tx.loc[mask].copy()
     
     # 添加卡片面值
-    df_vip['Card_Value'] = df_vip['Amount'].apply(determine_card_value)
+    df_vip['Card_Value'] = determine_card_value(df_vip['Amount'])
     
     # 只保留有效的卡片交易
     df_vip_valid = df_vip[df_vip['Card_Value'] > 0].copy()
     
+    # 交易日期：保持datetime64（截断到天），只在筛选后的小表上计算
+    df_vip_valid['Date'] = df_vip_valid['DateTime'].dt.floor('D')
+    
     # 判断购卡时属于哪一周的快照期
-    df_vip_valid['Snapshot_Week'] = df_vip_valid['DateTime'].apply(get_snapshot_week_for_datetime)
+    df_vip_valid['Snapshot_Week'] = get_snapshot_week_for_datetime(df_vip_valid['DateTime'])
     
     # 检查用户在购卡时是否在该周快照名单中
-    def check_in_snapshot(row):
-        week = row['Snapshot_Week']
-        if week == 0 or week not in weekly_snapshots:
-            return False
-        
-        if row['Chain'] in ['Ethereum', 'BNB Chain', 'Polygon']:
-            return row['From_Lower'] in weekly_snapshots[week]['evm']
-        elif row['Chain'] == 'Solana':
-            return row['From'] in weekly_snapshots[week]['solana']
-        return False
-    
-    df_vip_valid['In_Snapshot'] = df_vip_valid.apply(check_in_snapshot, axis=1)
+    # 所有 (周, 地址) 组合只构建一次：EVM地址为小写，Solana地址保持原样
+    snapshot_pairs = frozenset(
+        (week, addr)
+        for week, data in weekly_snapshots.items()
+        for addr in data['evm'] | data['solana']
+    )
+    
+    # 按链选取用于匹配的地址列，其他链不参与匹配
+    is_evm = df_vip_valid['Chain'].isin(evm_chains)
+    is_sol = df_vip_valid['Chain'] == 'Solana'
+    match_address = df_vip_valid['From_Lower'].where(is_evm, df_vip_valid['From'].where(is_sol))
+    
+    df_vip_valid['In_Snapshot'] = pd.MultiIndex.from_arrays(
+        [df_vip_valid['Snapshot_Week'], match_address]
+    ).isin(snapshot_pairs)
     
     # 计算折扣情况
     # 正确的折扣逻辑（研发需求文档）：
@@ -205,51 +320,58 @@ def analyze_vip_purchases():
     # - 200 USD: $200 + $7 × 0.7 = $204.9
     # - 25 USD: $25 + $1 = $26 (固定，不打折)
     
-    df_vip_valid['Original_Fee'] = df_vip_valid['Card_Value'] * 0.03 + 1  # 原始开卡费
-    df_vip_valid['Normal_Payment'] = df_vip_valid['Card_Value'] + df_vip_valid['Original_Fee']  # 普通用户应付（原价）
-    
-    # 特权用户折扣计算（$25卡不参与折扣）
-    def calculate_vip_payment(row):
-        if row['Card_Value'] == 25:
-            return 25 + 1  # $25卡固定$1手续费
-        else:
-            return row['Card_Value'] + row['Original_Fee'] * 0.70  # 其他卡享受30%折扣
+    card_value = df_vip_valid['Card_Value'].to_numpy()
+    original_fee = card_value * 0.03 + 1  # 原始开卡费
+    df_vip_valid['Original_Fee'] = original_fee
+    df_vip_valid['Normal_Payment'] = card_value + original_fee  # 普通用户应付（原价）
     
     # 活动开始日期：2025年7月21日
-    activity_start_date = pd.to_datetime('2025-07-21').date()
-    df_vip_valid['Is_After_Activity'] = df_vip_valid['Date'] >= activity_start_date
+    activity_start = pd.Timestamp('2025-07-21')
+    df_vip_valid['Is_After_Activity'] = df_vip_valid['DateTime'] >= activity_start
     
-    df_vip_valid['Expected_Payment'] = df_vip_valid.apply(calculate_vip_payment, axis=1)
+    # 特权用户折扣计算：$25卡固定$1手续费不参与折扣，其他卡享受30%折扣
+    df_vip_valid['Expected_Payment'] = np.where(card_value == 25, 25.0 + 1, card_value + original_fee * 0.70)
     df_vip_valid['VIP_Discount'] = df_vip_valid['Normal_Payment'] - df_vip_valid['Expected_Payment']  # 理论折扣金额
     df_vip_valid['Actual_Savings'] = df_vip_valid['Expected_Payment'] - df_vip_valid['Amount']  # 实际节省（正数=享受折扣，负数=多付了）
     
     # 折扣状态判断：综合考虑活动时间、快照名单、实付金额
-    def determine_discount_status(row):
-        if not row['Is_After_Activity']:
-            return '⏸️活动前'  # 活动前不可能享受折扣
-        elif not row['In_Snapshot']:
-            return '❓不在快照'  # 购卡时不在有效快照名单中
-        elif row['Actual_Savings'] >= -0.5:  # 容差0.5
-            return '✅已享受'
-        else:
-            return '❌未享受'
-    
-    df_vip_valid['Discount_Status'] = df_vip_valid.apply(determine_discount_status, axis=1)
+    is_after = df_vip_valid['Is_After_Activity']
+    in_snapshot = df_vip_valid['In_Snapshot']
+    df_vip_valid['Discount_Status'] = np.select(
+        [
+            ~is_after,  # 活动前不可能享受折扣
+            ~in_snapshot,  # 购卡时不在有效快照名单中
+            df_vip_valid['Actual_Savings'] >= -0.5,  # 容差0.5
+        ],
+        ['⏸️活动前', '❓不在快照', '✅已享受'],
+        default='❌未享受'
+    )
+    
+    # 报表统计直接复用上面的掩码计数，不再切出子DataFrame
+    total_count = len(df_vip_valid)
+    after_count = int(is_after.sum())
+    before_count = total_count - after_count
+    
+    # 活动前的交易状态都是"活动前"，因此其余状态的计数即为活动后的计数
+    status_counts = df_vip_valid['Discount_Status'].value_counts()
+    savings_mean = df_vip_valid.groupby('Discount_Status', sort=False)['Actual_Savings'].mean()
+    got_count = int(status_counts.get('✅已享受', 0))
+    no_count = int(status_counts.get('❌未享受', 0))
+    not_in_snapshot_status_count = int(status_counts.get('❓不在快照', 0))
     
     print(f"✅ 匹配完成:")
-    print(f"   特权用户购卡记录: {len(df_vip_valid)} 笔")
-    print(f"   其中 EVM链: {len(df_vip_valid[df_vip_valid['Chain'].isin(evm_chains)])} 笔")
-    print(f"   其中 Solana链: {len(df_vip_valid[df_vip_valid['Chain'] == 'Solana'])} 笔")
-    print(f"   活动前(2025-07-21前): {len(df_vip_valid[~df_vip_valid['Is_After_Activity']])} 笔")
-    print(f"   活动后(2025-07-21起): {len(df_vip_valid[df_vip_valid['Is_After_Activity']])} 笔")
+    print(f"   特权用户购卡记录: {total_count} 笔")
+    print(f"   其中 EVM链: {int(is_evm.sum())} 笔")
+    print(f"   其中 Solana链: {int(is_sol.sum())} 笔")
+    print(f"   活动前(2025-07-21前): {before_count} 笔")
+    print(f"   活动后(2025-07-21起): {after_count} 笔")
     # 统计快照匹配情况
-    activity_after = df_vip_valid[df_vip_valid['Is_After_Activity']]
-    in_snapshot_count = len(activity_after[activity_after['In_Snapshot']])
-    not_in_snapshot_count = len(activity_after[~activity_after['In_Snapshot']])
+    in_snapshot_count = int((is_after & in_snapshot).sum())
+    not_in_snapshot_count = after_count - in_snapshot_count
     
     print(f"\n📸 快照匹配情况（活动后）：")
-    print(f"   ✅ 购卡时在有效快照期内: {in_snapshot_count} 笔 ({in_snapshot_count/len(activity_after)*100:.1f}%)")
-    print(f"   ❌ 购卡时不在快照期内: {not_in_snapshot_count} 笔 ({not_in_snapshot_count/len(activity_after)*100:.1f}%)")
+    print(f"   ✅ 购卡时在有效快照期内: {in_snapshot_count} 笔 ({in_snapshot_count/after_count*100:.1f}%)")
+    print(f"   ❌ 购卡时不在快照期内: {not_in_snapshot_count} 笔 ({not_in_snapshot_count/after_count*100:.1f}%)")
     print(f"\n⚠️  说明：")
     print(f"   - 快照每7天一次（首次：2025-07-21 08:00 UTC）")
     print(f"   - 只有在有效快照期内购卡才能享受折扣")
@@ -260,34 +382,39 @@ def analyze_vip_purchases():
     print("📊 特权用户购卡情况 - 按日统计")
     print("=" * 80)
     
+    # 只扫描一次明细：先聚合到 (日期, 链, 面值) 粒度，两张报表都从这张小表汇总
+    # 明细聚合不排序，排序只在下面的小表上做
+    group_totals = df_vip_valid.groupby(['Date', 'Chain', 'Card_Value'], sort=False, observed=True).agg(
+        Count=('Amount', 'size'),
+        Amount=('Amount', 'sum'),
+        Expected_Payment=('Expected_Payment', 'sum'),
+        VIP_Discount=('VIP_Discount', 'sum')
+    ).reset_index()
+    group_totals['Card_Value_Sum'] = group_totals['Card_Value'] * group_totals['Count']
+    
     # 按日期和链分组统计
-    daily_summary = df_vip_valid.groupby(['Date', 'Chain']).agg({
-        'Card_Value': ['count', 'sum'],
-        'Amount': 'sum',
-        'Expected_Payment': 'sum',
-        'VIP_Discount': 'sum'
-    }).round(2)
+    daily_summary = group_totals.groupby(['Date', 'Chain'], observed=True)[
+        ['Count', 'Card_Value_Sum', 'Amount', 'Expected_Payment', 'VIP_Discount']
+    ].sum()
     
     daily_summary.columns = ['卡片数量', '卡片总面值(USD)', '实付金额(USD)', '应付金额(USD)', '应享折扣(USD)']
     
-    print(daily_summary.to_string())
+    print(daily_summary.to_string(float_format=REPORT_FLOAT_FORMAT))
     
     # 5. 按卡片面值统计
     print("\n" + "=" * 80)
     print("📊 特权用户购卡情况 - 按面值统计")
     print("=" * 80)
     
-    card_value_summary = df_vip_valid.groupby('Card_Value').agg({
-        'Card_Value': 'count',
-        'Expected_Payment': 'mean',
-        'Amount': 'mean',
-        'VIP_Discount': 'mean'
-    }).round(2)
-    
+    card_value_summary = group_totals.groupby('Card_Value')[
+        ['Count', 'Expected_Payment', 'Amount', 'VIP_Discount']
+    ].sum()
+    mean_columns = ['Expected_Payment', 'Amount', 'VIP_Discount']
+    card_value_summary[mean_columns] = card_value_summary[mean_columns].div(card_value_summary['Count'], axis=0)
     card_value_summary.columns = ['卡片数量', '应付(USD)', '实付(USD)', '应享折扣(USD)']
     card_value_summary.index.name = '卡片面值(USD)'
     
-    print(card_value_summary.to_string())
+    print(card_value_summary.to_string(float_format=REPORT_FLOAT_FORMAT))
     
     # 6. 保存详细数据到CSV
     output_file = 'vip_users_purchases.csv'
@@ -309,27 +436,28 @@ def analyze_vip_purchases():
     df_vip_valid_export.to_csv(output_file, index=False, encoding='utf-8-sig')
     print(f"\n✅ 详细数据已保存到: {output_file}")
     
-    # 分析折扣情况 - 活动前后对比
-    df_before = df_vip_valid[~df_vip_valid['Is_After_Activity']]
-    df_after = df_vip_valid[df_vip_valid['Is_After_Activity']]
+    # 同时输出Parquet副本，看板优先读取（带类型，免去CSV解析）；CSV保留给Excel和Secrets编码使用
+    parquet_output_file = os.path.splitext(output_file)[0] + '.parquet'
+    try:
+        df_vip_valid_export.to_parquet(parquet_output_file, index=False, compression='zstd')
+    except Exception as e:
+        print(f"⚠️  写入 {parquet_output_file} 时出错: {e}")
     
     # 7. 保存活动后未享受折扣的用户清单
-    if len(df_after) > 0:
-        after_no = df_after[df_after['Discount_Status'] == '❌未享受']
-        if len(after_no) > 0:
-            missing_discount_file = 'vip_missing_discount_after_activity.csv'
-            df_missing = after_no[[
-                'DateTime', 'Date', 'Chain', 'From', 'Asset',
-                'Card_Value', 'Amount', 'Expected_Payment', 'VIP_Discount', 'Actual_Savings', 'TxHash'
-            ]].sort_values('DateTime')
-            
-            df_missing.columns = [
-                'DateTime', 'Date', 'Chain', 'Wallet', 'Asset',
-                'Card_Value', 'Actual_Paid', 'Should_Paid', 'Should_Discount', 'Overpaid', 'TxHash'
-            ]
-            
-            df_missing.to_csv(missing_discount_file, index=False, encoding='utf-8-sig')
-            print(f"⚠️  活动后未享受折扣的交易清单已保存到: {missing_discount_file}")
+    if no_count > 0:
+        missing_discount_file = 'vip_missing_discount_after_activity.csv'
+        df_missing = df_vip_valid.loc[df_vip_valid['Discount_Status'] == '❌未享受', [
+            'DateTime', 'Date', 'Chain', 'From', 'Asset',
+            'Card_Value', 'Amount', 'Expected_Payment', 'VIP_Discount', 'Actual_Savings', 'TxHash'
+        ]].sort_values('DateTime')
+        
+        df_missing.columns = [
+            'DateTime', 'Date', 'Chain', 'Wallet', 'Asset',
+            'Card_Value', 'Actual_Paid', 'Should_Paid', 'Should_Discount', 'Overpaid', 'TxHash'
+        ]
+        
+        df_missing.to_csv(missing_discount_file, index=False, encoding='utf-8-sig')
+        print(f"⚠️  活动后未享受折扣的交易清单已保存到: {missing_discount_file}")
     
     # 8. 总结统计
     print("\n" + "=" * 80)
@@ -337,12 +465,12 @@ def analyze_vip_purchases():
     print("=" * 80)
     
     # 计算唯一用户数
-    evm_users = df_vip_valid[df_vip_valid['Chain'].isin(evm_chains)]['From_Lower'].nunique()
-    sol_users = df_vip_valid[df_vip_valid['Chain'] == 'Solana']['From'].nunique()
+    evm_users = df_vip_valid.loc[is_evm, 'From_Lower'].nunique()
+    sol_users = df_vip_valid.loc[is_sol, 'From'].nunique()
     
     print(f"特权用户总数: {len(evm_addresses) + len(solana_addresses)} 人")
     print(f"有购卡记录的特权用户: {evm_users + sol_users} 人 (EVM: {evm_users}, Solana: {sol_users})")
-    print(f"购卡总数: {len(df_vip_valid)} 张")
+    print(f"购卡总数: {total_count} 张")
     print(f"卡片总面值: ${df_vip_valid['Card_Value'].sum():,.0f}")
     print(f"普通用户需付: ${df_vip_valid['Normal_Payment'].sum():,.2f}")
     print(f"特权用户应付: ${df_vip_valid['Expected_Payment'].sum():,.2f}")
@@ -350,51 +478,48 @@ def analyze_vip_purchases():
     print(f"应享VIP折扣: ${df_vip_valid['VIP_Discount'].sum():,.2f}")
     
     # 分析折扣情况 - 总体
-    got_discount = df_vip_valid[df_vip_valid['Discount_Status'] == '✅已享受']
-    no_discount = df_vip_valid[df_vip_valid['Discount_Status'] == '❌未享受']
-    
     print(f"\n折扣情况分析（总体）:")
-    print(f"  ✅ 已享受VIP折扣: {len(got_discount)} 笔 ({len(got_discount)/len(df_vip_valid)*100:.1f}%)")
-    print(f"  ❌ 未享受VIP折扣: {len(no_discount)} 笔 ({len(no_discount)/len(df_vip_valid)*100:.1f}%)")
+    print(f"  ✅ 已享受VIP折扣: {got_count} 笔 ({got_count/total_count*100:.1f}%)")
+    print(f"  ❌ 未享受VIP折扣: {no_count} 笔 ({no_count/total_count*100:.1f}%)")
     
-    if len(got_discount) > 0:
-        print(f"  平均实际节省(已享受): ${got_discount['Actual_Savings'].mean():.2f}")
-    if len(no_discount) > 0:
-        print(f"  平均多付金额(未享受): ${-no_discount['Actual_Savings'].mean():.2f}")
+    if got_count > 0:
+        print(f"  平均实际节省(已享受): ${savings_mean['✅已享受']:.2f}")
+    if no_count > 0:
+        print(f"  平均多付金额(未享受): ${-savings_mean['❌未享受']:.2f}")
     
     print(f"\n折扣情况分析（按活动时间分）:")
     print(f"\n📅 活动前（2025-07-21之前）:")
-    if len(df_before) > 0:
-        print(f"  总计: {len(df_before)} 笔")
+    if before_count > 0:
+        print(f"  总计: {before_count} 笔")
         print(f"  说明: 活动尚未开始，所有交易均为正常全价购卡")
     
     print(f"\n📅 活动后（2025-07-21起）:")
-    if len(df_after) > 0:
-        after_got = df_after[df_after['Discount_Status'] == '✅已享受']
-        after_no = df_after[df_after['Discount_Status'] == '❌未享受']
-        after_not_in_snapshot = df_after[df_after['Discount_Status'] == '❓不在快照']
-        
-        print(f"  总计: {len(df_after)} 笔")
-        print(f"  ✅ 已享受折扣: {len(after_got)} 笔 ({len(after_got)/len(df_after)*100:.1f}%)")
-        print(f"  ❓ 不在快照期: {len(after_not_in_snapshot)} 笔 ({len(after_not_in_snapshot)/len(df_after)*100:.1f}%)")
-        print(f"  ❌ 在快照但未享受: {len(after_no)} 笔 ({len(after_no)/len(df_after)*100:.1f}%)")
+    if after_count > 0:
+        print(f"  总计: {after_count} 笔")
+        print(f"  ✅ 已享受折扣: {got_count} 笔 ({got_count/after_count*100:.1f}%)")
+        print(f"  ❓ 不在快照期: {not_in_snapshot_status_count} 笔 ({not_in_snapshot_status_count/after_count*100:.1f}%)")
+        print(f"  ❌ 在快照但未享受: {no_count} 笔 ({no_count/after_count*100:.1f}%)")
         
-        if len(after_got) > 0:
-            print(f"\n  平均节省(已享受): ${after_got['Actual_Savings'].mean():.2f}")
+        if got_count > 0:
+            print(f"\n  平均节省(已享受): ${savings_mean['✅已享受']:.2f}")
         
-        if len(after_not_in_snapshot) > 0:
+        if not_in_snapshot_status_count > 0:
             print(f"\n  📝 不在快照期说明：")
             print(f"     这些用户在某周持有NFT，但购卡时不在有效快照期内")
             print(f"     这是正常情况，无需处理")
         
-        if len(after_no) > 0:
+        if no_count > 0:
             print(f"\n  ⚠️  在快照但未享受折扣：")
-            print(f"     这{len(after_no)}笔交易在快照期内但未享受折扣")
-            print(f"     平均多付: ${-after_no['Actual_Savings'].mean():.2f}")
+            print(f"     这{no_count}笔交易在快照期内但未享受折扣")
+            print(f"     平均多付: ${-savings_mean['❌未享受']:.2f}")
             print(f"     需要检查系统折扣识别问题！")
     
     print("=" * 80)
 
 if __name__ == "__main__":
+    # 强制UTF-8输出（仅在作为脚本运行时，被导入时不改动调用方的输出流）
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+    
     analyze_vip_purchases()
 
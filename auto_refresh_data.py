@@ -6,10 +6,46 @@ GMT Pay 数据自动刷新脚本
 """
 
 import time
-import subprocess
+import contextlib
+import logging
 import os
 from datetime import datetime
-import sys
+from logging.handlers import RotatingFileHandler
+
+import analyze_vip_users
+
+# VIP分析的详细输出写入该日志，避免刷屏；超过大小上限时轮转，只保留最近几份
+VIP_REFRESH_LOG = 'vip_refresh.log'
+VIP_REFRESH_LOG_MAX_BYTES = 5 * 1024 * 1024
+VIP_REFRESH_LOG_BACKUPS = 3
+
+vip_logger = logging.getLogger('vip_refresh')
+vip_logger.setLevel(logging.INFO)
+vip_logger.propagate = False
+_vip_log_handler = RotatingFileHandler(
+    VIP_REFRESH_LOG, maxBytes=VIP_REFRESH_LOG_MAX_BYTES, backupCount=VIP_REFRESH_LOG_BACKUPS, encoding='utf-8'
+)
+_vip_log_handler.setFormatter(logging.Formatter('%(message)s'))
+vip_logger.addHandler(_vip_log_handler)
+
+class LogStream:
+    """将 print 输出按行写入 logger（供 redirect_stdout 使用）"""
+    
+    def __init__(self, logger):
+        self.logger = logger
+        self.pending = ''
+    
+    def write(self, text):
+        self.pending += text
+        *lines, self.pending = self.pending.split('\n')
+        for line in lines:
+            self.logger.info(line)
+        return len(text)
+    
+    def flush(self):
+        if self.pending:
+            self.logger.info(self.pending)
+            self.pending = ''
 
 def log(message):
     """输出日志"""
@@ -26,18 +62,17 @@ def refresh_data():
         
         # 2. 刷新VIP用户分析
         log("正在刷新VIP用户分析数据...")
-        result = subprocess.run(
-            [sys.executable, 'analyze_vip_users.py'],
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace'
-        )
-        
-        if result.returncode == 0:
+        # 进程内直接调用，避免每次刷新都重新启动解释器并导入pandas
+        try:
+            stream = LogStream(vip_logger)
+            try:
+                with contextlib.redirect_stdout(stream):
+                    analyze_vip_users.analyze_vip_purchases()
+            finally:
+                stream.flush()
             log("✓ VIP用户分析数据刷新成功")
-        else:
-            log(f"✗ VIP用户分析刷新失败: {result.stderr[:200]}")
+        except Exception as e:
+            log(f"✗ VIP用户分析刷新失败: {str(e)[:200]}")
         
         log("数据刷新完成！")
         return True
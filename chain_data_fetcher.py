@@ -12,10 +12,21 @@ def log_message(msg):
     pass  # 在生产环境中静默，避免I/O错误
 
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
+import orjson
+import ijson
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import time
-from typing import List, Dict, Optional
+import threading
+import atexit
+import functools
+import operator
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 import os
 from dotenv import load_dotenv
 import streamlit as st
@@ -36,17 +47,177 @@ def get_api_key(key_name):
     return os.getenv(key_name)
 
 
+def create_retry() -> Retry:
+    """临时错误（限流、服务端错误）的重试策略"""
+    return Retry(
+        total=5,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # 这里的 POST 都是只读的 JSON-RPC 查询，重试是安全的
+        allowed_methods=frozenset(['GET', 'POST'])
+    )
+
+
+def create_http_session() -> requests.Session:
+    """创建复用连接（keep-alive）并自动重试临时错误的 HTTP 会话"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=create_retry())
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Solana 上支持的代币 Mint 地址 → 资产名称
+MINT_TO_ASSET = {
+    'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v': 'USDC',
+    'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7': 'GGUSD',
+    'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB': 'USDT'
+}
+
+# Solana 代币余额条目（pre/postTokenBalances）中的余额字段，RPC 规范中必定存在
+get_ui_token_amount = operator.itemgetter('uiTokenAmount')
+
+# 标准化结果中取值固定的列使用 category 类型（各链类别一致，合并后不会退化为 object）
+COLUMN_DTYPES = {
+    'Asset': pd.CategoricalDtype(['GGUSD', 'USDT', 'USDC', 'Other']),
+    'Chain': pd.CategoricalDtype(['Ethereum', 'BNB Chain', 'Polygon', 'Solana']),
+    'Direction': pd.CategoricalDtype(['inflow', 'outflow'])
+}
+
+
+def apply_column_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """将标准化结果的 Asset/Chain/Direction 列转换为固定类别的 category 类型"""
+    return df.astype({col: dtype for col, dtype in COLUMN_DTYPES.items() if col in df.columns})
+
+
+# orjson 编码的请求体需要显式声明类型；
+# 同时声明接受 gzip 压缩的响应（requests 默认会带上，urllib3 连接池直接发请求时不会）
+JSON_HEADERS = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'}
+
+
+def post_json(session: requests.Session, url: str, payload, **kwargs) -> requests.Response:
+    """用 orjson 编码请求体发送 POST（替代 json= 参数的标准库编码）"""
+    return session.post(url, data=orjson.dumps(payload), headers=JSON_HEADERS, **kwargs)
+
+
+def parse_json(response: requests.Response):
+    """用 orjson 解析响应体（替代 response.json()），解析失败时抛出与 requests 相同的异常类型"""
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+
+
+def evm_address_matches(addresses: pd.Series, address: str) -> pd.Series:
+    """EVM 地址比较（不区分大小写）：先直接与小写地址比较，只对未命中的行转小写后再比较"""
+    address_lower = address.lower()
+    mask = addresses.eq(address_lower)
+    rest = ~mask & addresses.notna()
+    if rest.any():
+        mask[rest] = addresses[rest].str.lower().eq(address_lower)
+    return mask
+
+
+# 进程内所有抓取器共用的 HTTP 会话（Streamlit 重新运行脚本时模块不会重新加载，连接池得以保留）
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """获取进程内共享的 HTTP 会话（首次调用时创建）"""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = create_http_session()
+            atexit.register(_SESSION.close)
+        return _SESSION
+
+
+class RateLimiter:
+    """线程安全的限流器：保证相邻两次请求的发起时间至少间隔 1/calls_per_second 秒"""
+    
+    def __init__(self, calls_per_second: float):
+        self.min_interval = 1.0 / calls_per_second
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+    
+    def wait(self):
+        """阻塞到可以发起下一次请求"""
+        with self._lock:
+            now = time.monotonic()
+            wait_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.min_interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def cache_fetch_result(func):
+    """
+    缓存 fetch_transactions 的结果：相同 (抓取器, 链, 地址, 参数) 在 cache_duration 秒内重复调用时直接返回
+    
+    Streamlit 每次交互都会重新运行脚本并新建抓取器，缓存保存在类属性上，所有实例共享；
+    空结果（通常是请求失败）不缓存
+    """
+    @functools.wraps(func)
+    def wrapper(self, address, *args, **kwargs):
+        key = (type(self).__name__, getattr(self, 'chain', None), address, args, tuple(sorted(kwargs.items())))
+        
+        with self.cache_lock:
+            cached = self.data_cache.get(key)
+            cached_at = self.cache_timestamp.get(key, 0)
+        if cached is not None and time.time() - cached_at < self.cache_duration:
+            log_message(f"  使用缓存结果 ({time.time() - cached_at:.0f} 秒前抓取)")
+            return cached.copy()
+        
+        result = func(self, address, *args, **kwargs)
+        
+        if not result.empty:
+            with self.cache_lock:
+                self.data_cache[key] = result
+                self.cache_timestamp[key] = time.time()
+        return result.copy()
+    
+    return wrapper
+
+
 class ChainDataFetcher:
     """链上数据抓取器基类"""
     
+    # 抓取结果缓存（类属性，所有实例共享），见 cache_fetch_result
+    data_cache = {}
+    cache_timestamp = {}
+    cache_lock = threading.Lock()
+    
+    # 已抓取的原始转账记录缓存目录（已确认的区块不可变，历史记录只需抓取一次，之后只增量抓取新记录）
+    TRANSFER_CACHE_DIR = 'cache'
+    TRANSFER_COLUMNS: List[str] = []
+    
     def __init__(self):
-        self.data_cache = {}
-        self.cache_timestamp = {}
         self.cache_duration = 300  # 缓存5分钟
+        
+        # 所有抓取器共用一个会话，复用TCP/TLS连接
+        self.session = get_http_session()
     
     def fetch_transactions(self, address: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
         """抓取交易数据（需在子类中实现）"""
         raise NotImplementedError
+    
+    def _load_transfer_cache(self, cache_path: str) -> pd.DataFrame:
+        """读取转账缓存（不存在或读取失败时返回空表）"""
+        if os.path.exists(cache_path):
+            try:
+                return pd.read_parquet(cache_path, columns=self.TRANSFER_COLUMNS)
+            except Exception as e:
+                log_message(f"  读取转账缓存失败: {e}")
+        return pd.DataFrame(columns=self.TRANSFER_COLUMNS)
+    
+    def _save_transfer_cache(self, df: pd.DataFrame, cache_path: str):
+        """保存转账缓存"""
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            df.to_parquet(cache_path, index=False, compression='zstd')
+        except Exception as e:
+            log_message(f"  保存转账缓存失败: {e}")
 
 
 class EtherscanFetcher(ChainDataFetcher):
@@ -77,6 +248,25 @@ class EtherscanFetcher(ChainDataFetcher):
         }
     }
     
+    # Etherscan免费版rate limit: 5次/秒；V2 API各链共用一个Key，限流器在所有链之间共享
+    RATE_LIMITER = RateLimiter(4)
+    
+    # 同时并发请求的页数
+    PAGE_CONCURRENCY = 5
+    
+    # Etherscan 分页上限：page × offset 不能超过 10000 条，超出的页码只会返回错误
+    RESULT_WINDOW = 10000
+    
+    # 最新的若干区块尚未最终确认（可能被重组），增量抓取时总是重新抓取这段区块，不把它们当作已缓存
+    FINALITY_CONFIRMATIONS = 64
+    
+    # 代币精度（ERC-20 为 uint8）对应的缩放系数查表
+    DECIMAL_SCALES = 10.0 ** np.arange(256)
+    
+    # tokentx 返回字段中实际用到的列（同时也是转账缓存保存的列）
+    RAW_COLUMNS = ['blockNumber', 'timeStamp', 'value', 'tokenDecimal', 'tokenSymbol', 'contractAddress', 'hash', 'from', 'to']
+    TRANSFER_COLUMNS = RAW_COLUMNS
+    
     def __init__(self, chain: str = 'bsc'):
         super().__init__()
         self.chain = chain
@@ -91,7 +281,7 @@ class EtherscanFetcher(ChainDataFetcher):
     
     def fetch_token_transfers(self, address: str, start_timestamp: int = None, 
                              end_timestamp: int = None, page: int = 1, 
-                             offset: int = 100) -> List[Dict]:
+                             offset: int = 100, start_block: int = None) -> List[Dict]:
         """
         抓取代币转账记录（使用 Etherscan API V2）
         
@@ -101,6 +291,7 @@ class EtherscanFetcher(ChainDataFetcher):
             end_timestamp: 结束时间戳
             page: 页码
             offset: 每页数量
+            start_block: 只返回该区块（含）之后的记录
         
         Returns:
             交易列表
@@ -122,15 +313,15 @@ class EtherscanFetcher(ChainDataFetcher):
             params['startblock'] = 0
         if end_timestamp:
             params['endblock'] = 99999999
+        if start_block:
+            params['startblock'] = start_block
         
         try:
-            # 根据链类型使用相应的API端点
-            response = requests.get(api_url, params=params, timeout=30)
+            # 根据链类型使用相应的API端点（并发请求时由共享限流器控制频率）
+            self.RATE_LIMITER.wait()
+            response = self.session.get(api_url, params=params, timeout=30)
             response.raise_for_status()
-            data = response.json()
-            
-            # Etherscan免费版rate limit: 5次/秒
-            time.sleep(0.25)
+            data = parse_json(response)
             
             # 确保data是字典类型
             if not isinstance(data, dict):
@@ -159,6 +350,7 @@ class EtherscanFetcher(ChainDataFetcher):
             log_message(f"  {self.config['chain_name']} 处理数据时出错: {e}")
             return []
     
+    @cache_fetch_result
     def fetch_transactions(self, address: str, days: int = None, direction: str = 'inflow') -> pd.DataFrame:
         """
         抓取所有历史交易数据（不限制时间范围）
@@ -173,49 +365,82 @@ class EtherscanFetcher(ChainDataFetcher):
         """
         log_message(f"正在抓取 {self.config['chain_name']} 链的所有历史数据 ({'转出' if direction == 'outflow' else '转入'})...")
         
-        all_transactions = []
-        page = 1
-        max_pages = 1000  # 最大页数限制
+        # 读取已抓取的历史转账，只请求已最终确认区块之后的记录（由 API 的 startblock 过滤，不再重复下载旧区块）；
+        # 缓存中最新的 FINALITY_CONFIRMATIONS 个区块可能被重组，这段区块总是重新抓取并替换缓存中的记录
+        cache_path = os.path.join(self.TRANSFER_CACHE_DIR, f'{self.chain}_{address.lower()}_{direction}.parquet')
+        cached_transfers = self._load_transfer_cache(cache_path)
+        start_block = None
+        cached_max_block = None
+        if not cached_transfers.empty:
+            cached_blocks = cached_transfers['blockNumber'].astype('int64')
+            cached_max_block = int(cached_blocks.max())
+            start_block = max(cached_max_block - self.FINALITY_CONFIRMATIONS, 1)
+            log_message(f"  已缓存 {len(cached_transfers)} 条转账，从区块 {start_block} 开始增量抓取")
         
-        while page <= max_pages:
-            transactions = self.fetch_token_transfers(address, page=page, offset=40)
-            
-            if not transactions:
-                log_message(f"  第{page}页无数据，停止抓取")
-                break
-            
-            # 添加所有交易，不进行时间过滤
-            all_transactions.extend(transactions)
-            log_message(f"  第{page}页: {len(transactions)} 条交易")
-            
-            # 如果返回的交易数少于40条，说明已经到最后一页
-            if len(transactions) < 40:
-                log_message(f"  已到达最后一页")
-                break
-            
-            page += 1
-            time.sleep(0.25)  # Etherscan免费版rate limit: 5次/秒，需要至少0.2秒间隔
+        all_transactions = []
+        page_size = 40
+        # 预先算出所有可请求的页码（最大页数受 Etherscan 分页上限约束）
+        all_pages = range(1, self.RESULT_WINDOW // page_size + 1)
+        finished = False
+        # 是否确认抓全了缓存之后的记录（空页可能是请求失败，此时不更新缓存，避免留下缺口）
+        complete = False
+        
+        # 页码分页没有前后依赖，每轮并发请求连续的若干页，重叠网络等待时间
+        with ThreadPoolExecutor(max_workers=self.PAGE_CONCURRENCY) as executor:
+            for start in range(0, len(all_pages), self.PAGE_CONCURRENCY):
+                if finished:
+                    break
+                pages = all_pages[start:start + self.PAGE_CONCURRENCY]
+                results = executor.map(
+                    lambda p: self.fetch_token_transfers(address, page=p, offset=page_size, start_block=start_block), pages
+                )
+                
+                # 按页码顺序处理结果，遇到空页或不满页即停止
+                for current_page, transactions in zip(pages, results):
+                    if not transactions:
+                        log_message(f"  第{current_page}页无数据，停止抓取")
+                        finished = True
+                        break
+                    
+                    # 添加所有交易，不进行时间过滤
+                    all_transactions.extend(transactions)
+                    log_message(f"  第{current_page}页: {len(transactions)} 条交易")
+                    
+                    # 如果返回的交易数少于每页数量，说明已经到最后一页
+                    if len(transactions) < page_size:
+                        log_message(f"  已到达最后一页")
+                        finished = complete = True
+                        break
+            else:
+                # 所有页码都已请求（超出分页上限的更早记录无法获取）
+                if not finished:
+                    complete = True
         
         log_message(f"  {self.config['chain_name']} 总计获取 {len(all_transactions)} 条交易")
         
-        if not all_transactions:
-            log_message(f"  {self.config['chain_name']}: 未找到交易记录")
-            return pd.DataFrame()
+        # 一次遍历完成方向过滤（inflow: to = address；outflow: from = address），
+        # 并只取出后续需要的列构建 DataFrame，不再先构建包含全部字段的大表
+        address_field = 'to' if direction == 'inflow' else 'from'
+        address_lower = address.lower()
+        # API 返回的地址通常已是小写，相等时直接命中，不相等才转小写再比较
+        matched = [
+            tx for tx in all_transactions
+            if (value := tx.get(address_field) or '') == address_lower or value.lower() == address_lower
+        ]
+        # 与缓存的历史转账合并：两部分按区块区间划分，互不重叠，无需去重
+        new_transfers = pd.DataFrame(matched, columns=self.RAW_COLUMNS)
+        if cached_transfers.empty:
+            df = new_transfers
+        elif complete:
+            # 抓全了 start_block 之后的记录：以新结果替换缓存中未最终确认的区块（被重组掉的转账随之移除）
+            df = pd.concat([new_transfers, cached_transfers[cached_blocks < start_block]], ignore_index=True)
+        else:
+            # 抓取不完整：缓存保持原样，本次只补充缓存最新区块之后的新记录
+            new_blocks = pd.to_numeric(new_transfers['blockNumber'], errors='coerce')
+            df = pd.concat([new_transfers[new_blocks > cached_max_block], cached_transfers], ignore_index=True)
         
-        # 转换为 DataFrame
-        df = pd.DataFrame(all_transactions)
-        
-        if df.empty:
-            log_message(f"  {self.config['chain_name']}: 未找到交易记录")
-            return pd.DataFrame()
-        
-        # 根据方向过滤
-        if direction == 'inflow':
-            # 只保留转入交易（to = address）
-            df = df[df['to'].str.lower() == address.lower()]
-        else:  # outflow
-            # 只保留转出交易（from = address）
-            df = df[df['from'].str.lower() == address.lower()]
+        if complete and (not new_transfers.empty or not cached_transfers.empty):
+            self._save_transfer_cache(df, cache_path)
         
         if df.empty:
             log_message(f"  {self.config['chain_name']}: 无{direction}交易记录")
@@ -229,84 +454,109 @@ class EtherscanFetcher(ChainDataFetcher):
     
     def _process_data(self, df: pd.DataFrame, direction: str = 'inflow') -> pd.DataFrame:
         """处理和标准化数据"""
-        result = pd.DataFrame()
-        
-        # 时间转换
-        result['DateTime'] = pd.to_datetime(df['timeStamp'].astype(int), unit='s')
-        
-        # 金额转换 (考虑代币精度)
-        result['Amount'] = df.apply(lambda row: 
-            float(row['value']) / (10 ** int(row['tokenDecimal'])) 
-            if row['tokenDecimal'] else 0, axis=1
-        )
-        
-        # 代币识别
-        result['Asset'] = df.apply(lambda row: self._identify_token(
-            row.get('tokenSymbol', ''),
-            row.get('contractAddress', '')
-        ), axis=1)
-        
-        # 链信息
-        result['Chain'] = self.config['chain_name']
-        
-        # 交易哈希和地址
-        result['TxHash'] = df['hash']
-        result['From'] = df['from']
-        result['To'] = df['to']
-        
-        # 方向标记
-        result['Direction'] = direction
+        # 金额转换 (考虑代币精度；无精度信息的记为0)
+        # value 是最长约30位的十进制字符串，由 to_numeric 在C层直接解析为浮点数，不经过Python大整数
+        value = pd.to_numeric(df['value'], errors='coerce')
+        decimals = pd.to_numeric(df['tokenDecimal'], errors='coerce')
+        valid = decimals.between(0, 255)
+        scale = self.DECIMAL_SCALES[decimals.where(valid, 0).to_numpy(dtype=np.int64)]
+        amount = (value / scale).where(valid, 0)
+        
+        # 所有输出列一次构建
+        result = pd.DataFrame({
+            # 时间转换
+            'DateTime': pd.to_datetime(df['timeStamp'].astype('int64'), unit='s'),
+            'Amount': amount,
+            # 代币识别
+            'Asset': self._identify_tokens(df['tokenSymbol'], df['contractAddress']),
+            # 链信息
+            'Chain': self.config['chain_name'],
+            # 交易哈希和地址
+            'TxHash': df['hash'],
+            'From': df['from'],
+            'To': df['to'],
+            # 方向标记
+            'Direction': direction
+        })
         
         # 过滤无效金额
-        result = result[result['Amount'] > 0]
+        return apply_column_dtypes(result[result['Amount'] > 0])
+    
+    # 各链上的代币合约地址（未列出的链按 BNB Chain 处理）
+    TOKEN_CONTRACTS = {
+        'polygon': {
+            'GGUSD': '0xffffff9936bd58a008855b0812b44d2c8dffe2aa',
+            'USDT': '0xc2132d05d31c914a87c6611c10748aeb04b58e8f',  # USDT on Polygon
+            'USDC': '0x3c499c542cef5e3811e1192ce70d8cc03d5c3359'   # USDC on Polygon
+        },
+        'ethereum': {
+            # Ethereum链不支持GGUSD
+            'USDT': '0xdac17f958d2ee523a2206206994597c13d831ec7',  # USDT on Ethereum
+            'USDC': '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48'   # USDC on Ethereum
+        },
+        'solana': {
+            'GGUSD': 'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7',  # GGUSD on Solana
+            'USDT': 'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB',   # USDT on Solana
+            'USDC': 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'    # USDC on Solana
+        },
+        'bsc': {
+            'GGUSD': '0xffffff9936bd58a008855b0812b44d2c8dffe2aa',
+            'USDT': '0x55d398326f99059ff775485246999027b3197955',  # USDT on BNB Chain
+            'USDC': '0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d'   # USDC on BNB Chain
+        }
+    }
+    
+    # 各链合约地址（小写）→ 资产名称，用于按合约地址直接查表
+    CONTRACT_TO_ASSET = {
+        chain: {address.lower(): asset for asset, address in contracts.items()}
+        for chain, contracts in TOKEN_CONTRACTS.items()
+    }
+    
+    # 识别顺序：先按合约地址，再按symbol
+    TOKEN_PRIORITY = ['GGUSD', 'USDT', 'USDC']
+    
+    def _identify_tokens(self, symbols: pd.Series, contract_addresses: pd.Series) -> np.ndarray:
+        """批量识别代币类型（向量化，规则与 _identify_token 相同）"""
+        contract_to_asset = self.CONTRACT_TO_ASSET.get(self.chain, self.CONTRACT_TO_ASSET['bsc'])
+        symbol_upper = symbols.fillna('').astype(str).str.upper()
+        contract_lower = contract_addresses.fillna('').astype(str).str.lower()
+        
+        # 优先使用合约地址识别（哈希查表），未命中的再使用symbol识别
+        by_contract = contract_lower.map(contract_to_asset)
+        by_symbol = np.select(
+            [symbol_upper.str.contains(asset, regex=False) for asset in self.TOKEN_PRIORITY],
+            self.TOKEN_PRIORITY,
+            default='Other'
+        )
         
-        return result
+        return np.where(by_contract.notna(), by_contract, by_symbol)
     
     def _identify_token(self, symbol: str, contract_address: str) -> str:
         """识别代币类型"""
-        symbol_upper = symbol.upper()
-        contract_lower = contract_address.lower()
-        
-        # 根据链类型使用不同的合约地址
-        if self.chain == 'polygon':
-            # Polygon链上的合约地址
-            GGUSD_CONTRACT = '0xffffff9936bd58a008855b0812b44d2c8dffe2aa'
-            USDT_CONTRACT = '0xc2132d05d31c914a87c6611c10748aeb04b58e8f'  # USDT on Polygon
-            USDC_CONTRACT = '0x3c499c542cef5e3811e1192ce70d8cc03d5c3359'  # USDC on Polygon
-        elif self.chain == 'ethereum':
-            # Ethereum链上的合约地址
-            USDT_CONTRACT = '0xdac17f958d2ee523a2206206994597c13d831ec7'  # USDT on Ethereum
-            USDC_CONTRACT = '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48'  # USDC on Ethereum
-            GGUSD_CONTRACT = None  # Ethereum链不支持GGUSD
-        elif self.chain == 'solana':
-            # Solana链上的合约地址
-            USDT_CONTRACT = 'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB'  # USDT on Solana
-            USDC_CONTRACT = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'  # USDC on Solana
-            GGUSD_CONTRACT = 'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7'  # GGUSD on Solana
-        else:
-            # BNB Chain上的合约地址
-            GGUSD_CONTRACT = '0xffffff9936bd58a008855b0812b44d2c8dffe2aa'
-            USDT_CONTRACT = '0x55d398326f99059ff775485246999027b3197955'  # USDT on BNB Chain
-            USDC_CONTRACT = '0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d'  # USDC on BNB Chain
-        
-        # 优先使用合约地址识别
-        if GGUSD_CONTRACT and contract_lower == GGUSD_CONTRACT.lower():
-            return 'GGUSD'
-        elif contract_lower == USDT_CONTRACT.lower():
-            return 'USDT'
-        elif contract_lower == USDC_CONTRACT.lower():
-            return 'USDC'
-        # 然后使用symbol识别
-        elif 'GGUSD' in symbol_upper:
-            return 'GGUSD'
-        elif 'USDT' in symbol_upper:
-            return 'USDT'
-        elif 'USDC' in symbol_upper:
-            return 'USDC'
-        else:
-            return 'Other'
+        return identify_etherscan_token(self.chain, symbol, contract_address)
 
 
+# 识别结果只取决于 (链, 代币符号, 合约地址)，按这三者在模块级缓存，所有抓取器实例共享，
+# 缓存中不持有抓取器实例
+@functools.lru_cache(maxsize=4096)
+def identify_etherscan_token(chain: str, symbol: str, contract_address: str) -> str:
+    """识别代币类型（Etherscan 抓取器的合约地址配置）"""
+    symbol_upper = symbol.upper()
+    contract_lower = contract_address.lower()
+    
+    # 根据链类型使用不同的合约地址
+    contracts = EtherscanFetcher.TOKEN_CONTRACTS.get(chain, EtherscanFetcher.TOKEN_CONTRACTS['bsc'])
+    
+    # 优先使用合约地址识别
+    for asset in EtherscanFetcher.TOKEN_PRIORITY:
+        if asset in contracts and contract_lower == contracts[asset].lower():
+            return asset
+    # 然后使用symbol识别
+    for asset in EtherscanFetcher.TOKEN_PRIORITY:
+        if asset in symbol_upper:
+            return asset
+    return 'Other'
+
 class MoralisFetcher(ChainDataFetcher):
     """
     Moralis API 数据抓取器
@@ -382,6 +632,7 @@ class MoralisFetcher(ChainDataFetcher):
             log_message(f"  {self.config['chain_name']} Moralis API 错误: {e}")
             return {"result": [], "cursor": None}
     
+    @cache_fetch_result
     def fetch_transactions(self, address: str, days: int = None, direction: str = 'inflow') -> pd.DataFrame:
         """
         抓取所有历史交易数据（不限制时间范围）
@@ -443,10 +694,10 @@ class MoralisFetcher(ChainDataFetcher):
         # 根据方向过滤
         if direction == 'inflow':
             # 只保留转入交易（to_address = address）
-            df = df[df['to_address'].str.lower() == address.lower()]
+            df = df[evm_address_matches(df['to_address'], address)]
         else:  # outflow
             # 只保留转出交易（from_address = address）
-            df = df[df['from_address'].str.lower() == address.lower()]
+            df = df[evm_address_matches(df['from_address'], address)]
         
         if df.empty:
             log_message(f"  {self.config['chain_name']}: 无{direction}交易记录")
@@ -481,6 +732,9 @@ class MoralisFetcher(ChainDataFetcher):
         result['TxHash'] = df['transaction_hash']
         result['From'] = df['from_address']
         result['To'] = df['to_address']
+        # 日志序号：与交易哈希一起唯一标识一笔转账（同一交易中的多笔转账各有不同序号）
+        if 'log_index' in df.columns:
+            result['LogIndex'] = pd.to_numeric(df['log_index'], errors='coerce')
         
         # 方向标记
         result['Direction'] = direction
@@ -488,46 +742,53 @@ class MoralisFetcher(ChainDataFetcher):
         # 过滤无效金额
         result = result[result['Amount'] > 0]
         
-        return result
+        return apply_column_dtypes(result)
     
     def _identify_token(self, symbol: str, contract_address: str) -> str:
         """识别代币类型"""
-        symbol_upper = symbol.upper()
-        contract_lower = contract_address.lower()
-        
-        # 根据链类型使用不同的合约地址
-        if self.chain == 'polygon':
-            # Polygon链上的合约地址
-            GGUSD_CONTRACT = '0xffffff9936bd58a008855b0812b44d2c8dffe2aa'
-            USDT_CONTRACT = '0xc2132d05d31c914a87c6611c10748aeb04b58e8f'  # USDT on Polygon
-            USDC_CONTRACT = '0x3c499c542cef5e3811e1192ce70d8cc03d5c3359'  # USDC on Polygon
-        elif self.chain == 'ethereum':
-            # Ethereum链上的合约地址
-            USDT_CONTRACT = '0xdac17f958d2ee523a2206206994597c13d831ec7'  # USDT on Ethereum
-            USDC_CONTRACT = '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48'  # USDC on Ethereum
-            GGUSD_CONTRACT = None  # Ethereum链不支持GGUSD
-        else:
-            # BNB Chain上的合约地址
-            GGUSD_CONTRACT = '0xffffff9936bd58a008855b0812b44d2c8dffe2aa'
-            USDT_CONTRACT = '0x55d398326f99059ff775485246999027b3197955'  # USDT on BNB Chain
-            USDC_CONTRACT = '0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d'  # USDC on BNB Chain
-        
-        # 优先使用合约地址识别
-        if GGUSD_CONTRACT and contract_lower == GGUSD_CONTRACT.lower():
-            return 'GGUSD'
-        elif contract_lower == USDT_CONTRACT.lower():
-            return 'USDT'
-        elif contract_lower == USDC_CONTRACT.lower():
-            return 'USDC'
-        # 然后使用symbol识别
-        elif 'GGUSD' in symbol_upper:
-            return 'GGUSD'
-        elif 'USDT' in symbol_upper:
-            return 'USDT'
-        elif 'USDC' in symbol_upper:
-            return 'USDC'
-        else:
-            return 'Other'
+        return identify_moralis_token(self.chain, symbol, contract_address)
+
+
+# 与 identify_etherscan_token 相同，按 (链, 代币符号, 合约地址) 在模块级缓存
+@functools.lru_cache(maxsize=4096)
+def identify_moralis_token(chain: str, symbol: str, contract_address: str) -> str:
+    """识别代币类型（Moralis 抓取器的合约地址配置）"""
+    symbol_upper = symbol.upper()
+    contract_lower = contract_address.lower()
+    
+    # 根据链类型使用不同的合约地址
+    if chain == 'polygon':
+        # Polygon链上的合约地址
+        GGUSD_CONTRACT = '0xffffff9936bd58a008855b0812b44d2c8dffe2aa'
+        USDT_CONTRACT = '0xc2132d05d31c914a87c6611c10748aeb04b58e8f'  # USDT on Polygon
+        USDC_CONTRACT = '0x3c499c542cef5e3811e1192ce70d8cc03d5c3359'  # USDC on Polygon
+    elif chain == 'ethereum':
+        # Ethereum链上的合约地址
+        USDT_CONTRACT = '0xdac17f958d2ee523a2206206994597c13d831ec7'  # USDT on Ethereum
+        USDC_CONTRACT = '0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48'  # USDC on Ethereum
+        GGUSD_CONTRACT = None  # Ethereum链不支持GGUSD
+    else:
+        # BNB Chain上的合约地址
+        GGUSD_CONTRACT = '0xffffff9936bd58a008855b0812b44d2c8dffe2aa'
+        USDT_CONTRACT = '0x55d398326f99059ff775485246999027b3197955'  # USDT on BNB Chain
+        USDC_CONTRACT = '0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d'  # USDC on BNB Chain
+    
+    # 优先使用合约地址识别
+    if GGUSD_CONTRACT and contract_lower == GGUSD_CONTRACT.lower():
+        return 'GGUSD'
+    elif contract_lower == USDT_CONTRACT.lower():
+        return 'USDT'
+    elif contract_lower == USDC_CONTRACT.lower():
+        return 'USDC'
+    # 然后使用symbol识别
+    elif 'GGUSD' in symbol_upper:
+        return 'GGUSD'
+    elif 'USDT' in symbol_upper:
+        return 'USDT'
+    elif 'USDC' in symbol_upper:
+        return 'USDC'
+    else:
+        return 'Other'
 
 
 class SolanaFetcher(ChainDataFetcher):
@@ -536,6 +797,18 @@ class SolanaFetcher(ChainDataFetcher):
     使用 Solana RPC API 和 Helius API
     """
     
+    # 同时翻页的 Token Account 数量上限（控制 Helius RPC 并发请求数）
+    SIGNATURE_CONCURRENCY = 8
+    
+    # JSON-RPC 批量请求每批的调用数（批次过大时，单个慢调用会拖慢整批响应）
+    RPC_BATCH_SIZE = 20
+    
+    # 同时提交的 parseTransactions 批次数上限（触发限流时自动减半）
+    PARSE_CONCURRENCY = 10
+    
+    # 转账缓存中保存的已解析 Helius 转账字段
+    TRANSFER_COLUMNS = ['timestamp', 'signature', 'mint', 'tokenAmount', 'fromUserAccount']
+    
     def __init__(self):
         super().__init__()
         self.chain_name = 'Solana'
@@ -547,9 +820,17 @@ class SolanaFetcher(ChainDataFetcher):
         if self.helius_api_key:
             log_message("使用 Helius Enhanced API")
             self.helius_api_url = f'https://api.helius.xyz/v0/addresses'
+            self.rpc_url = f'https://mainnet.helius-rpc.com/?api-key={self.helius_api_key}'
         else:
             log_message("警告: 未设置 HELIUS_API_KEY, Solana 数据获取可能失败")
             self.helius_api_url = None
+            self.rpc_url = 'https://api.mainnet-beta.solana.com'
+        
+        # RPC 服务端是否支持批量请求（检测到不支持后降级为并发单次请求）
+        self.rpc_batch_supported = True
+        
+        # 逐笔 RPC 调用的热路径直接使用 urllib3 连接池，省去 requests 每次构建请求的开销
+        self._pool = urllib3.PoolManager(num_pools=4, maxsize=32, retries=create_retry())
     
     def _identify_token(self, symbol: str, contract_address: str) -> str:
         """识别代币类型"""
@@ -578,6 +859,7 @@ class SolanaFetcher(ChainDataFetcher):
         else:
             return 'Other'
     
+    @cache_fetch_result
     def fetch_transactions(self, address: str, days: int = None) -> pd.DataFrame:
         """
         抓取 Solana 地址的所有历史交易记录（不限制时间范围）
@@ -610,7 +892,7 @@ class SolanaFetcher(ChainDataFetcher):
         """
         log_message("  使用 Helius RPC + Enhanced API...")
         
-        rpc_url = f'https://mainnet.helius-rpc.com/?api-key={self.helius_api_key}'
+        rpc_url = self.rpc_url
         
         try:
             # 步骤1: 获取所有 Token Accounts
@@ -626,8 +908,8 @@ class SolanaFetcher(ChainDataFetcher):
                 ]
             }
             
-            response = requests.post(rpc_url, json=token_accounts_payload, timeout=30)
-            result = response.json()
+            response = post_json(self.session, rpc_url, token_accounts_payload, timeout=30)
+            result = parse_json(response)
             
             if 'error' in result:
                 log_message(f"  获取 Token Accounts 失败: {result['error']}")
@@ -636,122 +918,128 @@ class SolanaFetcher(ChainDataFetcher):
             token_accounts = result.get('result', {}).get('value', [])
             log_message(f"  找到 {len(token_accounts)} 个 Token Accounts")
             
+            # 读取已解析的历史转账，只抓取比缓存更新的签名
+            cache_path = os.path.join(self.TRANSFER_CACHE_DIR, f'solana_{address}.parquet')
+            cached_transfers = self._load_transfer_cache(cache_path)
+            since_timestamp = None
+            known_signatures = set()
+            if not cached_transfers.empty:
+                since_timestamp = int(cached_transfers['timestamp'].max())
+                known_signatures = set(cached_transfers['signature'])
+                log_message(f"  已缓存 {len(cached_transfers)} 条转账，增量抓取 {since_timestamp} 之后的签名")
+            
             # 步骤2: 获取每个 Token Account 的交易签名
             log_message("  步骤2: 获取交易签名列表...")
-            all_signatures = []
-            
+            # 只处理我们关心的代币
+            target_accounts = []
             for acc in token_accounts:
-                token_account_address = acc['pubkey']
                 mint = acc['account']['data']['parsed']['info'].get('mint', '')
-                
-                # 只处理我们关心的代币
-                USDC_MINT = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
-                GGUSD_MINT = 'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7'
-                USDT_MINT = 'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB'
-                
-                if mint not in [USDC_MINT, GGUSD_MINT, USDT_MINT]:
+                if mint not in MINT_TO_ASSET:
                     continue
-                
-                token_name = 'USDC' if mint == USDC_MINT else ('GGUSD' if mint == GGUSD_MINT else 'USDT')
-                
-                # 获取该 Token Account 的所有交易签名
-                before_signature = None
-                iteration = 0
-                while True:
-                    iteration += 1
-                    rpc_payload = {
-                        "jsonrpc": "2.0",
-                        "id": 1,
-                        "method": "getSignaturesForAddress",
-                        "params": [token_account_address, {"limit": 1000}]
-                    }
-                    
-                    if before_signature:
-                        rpc_payload["params"][1]["before"] = before_signature
-                    
-                    response = requests.post(rpc_url, json=rpc_payload, timeout=30)
-                    result = response.json()
-                    
-                    if 'error' in result:
-                        break
-                    
-                    signatures = result.get('result', [])
-                    if not signatures:
-                        break
-                    
-                    # 收集所有签名
-                    valid_signatures = []
-                    for sig in signatures:
-                        valid_signatures.append(sig['signature'])
-                    
-                    all_signatures.extend(valid_signatures)
-                    
-                    # 如果返回的交易数少于1000，说明已经到达最早记录
-                    if len(signatures) < 1000:
-                        break
-                    
-                    before_signature = signatures[-1]['signature']
-                    time.sleep(0.1)
-                    
-                    # 安全上限，避免无限循环
-                    if iteration >= 1000:
-                        log_message(f"    {token_name}: 达到1000页上限，停止抓取")
-                        break
+                target_accounts.append((acc['pubkey'], MINT_TO_ASSET[mint]))
+            
+            # 各 Token Account 的签名游标互不依赖，并发翻页（单个账户内部仍按 before 游标顺序翻页），
+            # 收集时即用集合去重（同一交易可能涉及多个 Token Account）
+            signature_set = set()
+            # 是否所有账户都翻页到了缓存衔接点/最早记录（有账户中途失败时不更新缓存，避免留下永久缺口）
+            all_complete = True
+            with ThreadPoolExecutor(max_workers=self.SIGNATURE_CONCURRENCY) as executor:
+                results = executor.map(
+                    lambda item: self._paginate_account_signatures(rpc_url, *item, since_timestamp),
+                    target_accounts
+                )
+                for signatures, complete in results:
+                    signature_set.update(signatures)
+                    all_complete = all_complete and complete
             
-            # 去重
-            all_signatures = list(set(all_signatures))
-            log_message(f"  总计(去重后): {len(all_signatures)} 个交易签名")
+            # 跳过已解析过的签名（缓存最新时间点同一秒内的交易可能已在缓存中）
+            signature_set -= known_signatures
+            all_signatures = list(signature_set)
+            log_message(f"  总计(去重后): {len(all_signatures)} 个新交易签名")
             
-            if not all_signatures:
+            if not all_signatures and cached_transfers.empty:
                 log_message(f"  Solana: 无交易记录")
                 return pd.DataFrame()
             
             # 步骤3: 批量解析交易 (使用 Enhanced API)
             log_message("  步骤3: 解析交易详情...")
-            all_token_transfers = []
+            # 按列收集（每列一个列表），最后一次性构建 DataFrame，避免每条转账创建一个字典
+            ts_list, sig_list, mint_list, amount_list, from_list = [], [], [], [], []
             
             # Helius parseTransactions API 一次最多100个交易
             batch_size = 100
             parse_url = 'https://api.helius.xyz/v0/transactions'
             
-            for i in range(0, len(all_signatures), batch_size):
-                batch = all_signatures[i:i+batch_size]
-                
-                params = {'api-key': self.helius_api_key}
-                payload = {"transactions": batch}
-                
-                response = requests.post(parse_url, params=params, json=payload, timeout=30)
-                response.raise_for_status()
-                
-                transactions = response.json()
+            # 各批次互不依赖，按窗口并发提交；被限流时并发数减半后重试该批次
+            pending_batches = [all_signatures[i:i+batch_size] for i in range(0, len(all_signatures), batch_size)]
+            workers = self.PARSE_CONCURRENCY
+            parsed_count = 0
+            
+            while pending_batches:
+                window, pending_batches = pending_batches[:workers], pending_batches[workers:]
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(
+                        lambda batch: self._parse_transaction_batch(parse_url, batch), window
+                    ))
                 
-                # 解析每个交易的 token transfers
-                for tx in transactions:
-                    tx_timestamp = tx.get('timestamp', 0)
-                    token_transfers = tx.get('tokenTransfers', [])
+                rate_limited = []
+                for batch, transactions in zip(window, results):
+                    if transactions is None:
+                        rate_limited.append(batch)
+                        continue
                     
-                    for transfer in token_transfers:
-                        # 只保留转入到目标地址的交易
-                        if transfer.get('toUserAccount', '').lower() == address.lower():
-                            all_token_transfers.append({
-                                'timestamp': tx_timestamp,
-                                'signature': tx.get('signature', ''),
-                                'mint': transfer.get('mint', ''),
-                                'tokenAmount': transfer.get('tokenAmount', 0),
-                                'fromUserAccount': transfer.get('fromUserAccount', ''),
-                            })
+                    # 解析每个交易的 token transfers
+                    for tx in transactions:
+                        tx_timestamp = tx.get('timestamp', 0)
+                        tx_signature = tx.get('signature', '')
+                        token_transfers = tx.get('tokenTransfers', [])
+                        
+                        for transfer in token_transfers:
+                            # 只保留转入到目标地址的交易（Solana base58 地址区分大小写，直接比较）
+                            if transfer.get('toUserAccount') == address:
+                                ts_list.append(tx_timestamp)
+                                sig_list.append(tx_signature)
+                                mint_list.append(transfer.get('mint', ''))
+                                amount_list.append(transfer.get('tokenAmount', 0))
+                                from_list.append(transfer.get('fromUserAccount', ''))
+                    parsed_count += len(batch)
                 
-                if (i + batch_size) % 500 == 0 or i + batch_size >= len(all_signatures):
-                    log_message(f"    已解析 {min(i+batch_size, len(all_signatures))}/{len(all_signatures)}, 找到 {len(all_token_transfers)} 个 token transfers")
-                time.sleep(0.2)
+                if rate_limited:
+                    if workers == 1:
+                        # 并发降到1仍被限流：停止解析，保留已解析的转账，本次结果不写入缓存（未解析的签名下次重新抓取）
+                        log_message(f"    Helius parseTransactions 持续限流，剩余 {len(rate_limited) + len(pending_batches)} 批未解析")
+                        all_complete = False
+                        break
+                    workers = max(1, workers // 2)
+                    pending_batches = rate_limited + pending_batches
+                    log_message(f"    触发限流，并发数降为 {workers}")
+                
+                log_message(f"    已解析 {parsed_count}/{len(all_signatures)}, 找到 {len(sig_list)} 个 token transfers")
+            
+            # 转换为 DataFrame，与缓存的历史转账合并
+            new_transfers = pd.DataFrame({
+                'timestamp': np.asarray(ts_list, dtype=np.int64),
+                'signature': sig_list,
+                'mint': mint_list,
+                'tokenAmount': np.asarray(amount_list, dtype=np.float64),
+                'fromUserAccount': from_list
+            })
+            if cached_transfers.empty:
+                df = new_transfers
+            elif new_transfers.empty:
+                df = cached_transfers
+            else:
+                df = pd.concat([cached_transfers, new_transfers], ignore_index=True)
+            
+            if all_complete and not new_transfers.empty:
+                self._save_transfer_cache(df, cache_path)
+            elif not all_complete:
+                log_message("  部分签名未抓取完整，本次结果不写入缓存")
             
-            if not all_token_transfers:
+            if df.empty:
                 log_message(f"  Solana: 无 token 转账记录")
                 return pd.DataFrame()
             
-            # 转换为 DataFrame
-            df = pd.DataFrame(all_token_transfers)
-            
             # 标准化数据格式
             result = pd.DataFrame()
             result['DateTime'] = pd.to_datetime(df['timestamp'], unit='s')
@@ -763,21 +1051,14 @@ class SolanaFetcher(ChainDataFetcher):
             result['Direction'] = 'inflow'  # 都是转入交易
             
             # 识别代币类型
-            USDC_MINT = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
-            GGUSD_MINT = 'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7'
-            USDT_MINT = 'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB'
-            
-            result['Asset'] = df['mint'].apply(lambda x: 
-                'USDC' if x == USDC_MINT 
-                else ('GGUSD' if x == GGUSD_MINT 
-                else ('USDT' if x == USDT_MINT else 'Other')))
+            result['Asset'] = df['mint'].map(MINT_TO_ASSET).fillna('Other')
             
             # 过滤有效数据
             result = result.dropna(subset=['Amount', 'DateTime'])
             result = result[result['Amount'] > 0]
             
             log_message(f"  Solana: 成功获取 {len(result)} 条有效交易")
-            return result
+            return apply_column_dtypes(result)
             
         except requests.exceptions.RequestException as e:
             log_message(f"  Helius API 请求失败: {e}")
@@ -788,12 +1069,118 @@ class SolanaFetcher(ChainDataFetcher):
             traceback.print_exc()
             return pd.DataFrame()
     
+    def _parse_transaction_batch(self, parse_url: str, batch: List[str]) -> Optional[List[Dict]]:
+        """
+        调用 Helius parseTransactions 解析一批交易
+        
+        Returns:
+            解析后的交易列表；重试次数用尽（持续限流或服务端错误）时返回 None
+        """
+        params = {'api-key': self.helius_api_key}
+        payload = {"transactions": batch}
+        
+        try:
+            response = post_json(self.session, parse_url, payload, params=params, timeout=30, stream=True)
+        except requests.exceptions.RetryError:
+            return None
+        
+        with response:
+            response.raise_for_status()
+            
+            # 响应体较大（含完整指令和账户数据），流式逐个解析交易，只保留用到的字段
+            response.raw.decode_content = True
+            return [
+                {
+                    'timestamp': tx.get('timestamp', 0),
+                    'signature': tx.get('signature', ''),
+                    'tokenTransfers': tx.get('tokenTransfers', [])
+                }
+                for tx in ijson.items(response.raw, 'item', use_float=True)
+            ]
+    
+    def _paginate_account_signatures(self, rpc_url: str, token_account_address: str,
+                                     token_name: str, since_timestamp: int = None) -> Tuple[List[str], bool]:
+        """
+        按 before 游标翻页获取单个 Token Account 的所有交易签名
+        
+        Args:
+            rpc_url: Helius RPC 地址
+            token_account_address: Token Account 地址
+            token_name: 代币名称（用于日志）
+            since_timestamp: 只获取该时间戳（含）之后的签名，None 表示获取全部历史
+        
+        Returns:
+            (交易签名列表, 是否完整)：RPC 出错或达到翻页上限时不完整
+        """
+        account_signatures = []
+        before_signature = None
+        iteration = 0
+        complete = False
+        while True:
+            iteration += 1
+            rpc_payload = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "getSignaturesForAddress",
+                "params": [token_account_address, {"limit": 1000}]
+            }
+            
+            if before_signature:
+                rpc_payload["params"][1]["before"] = before_signature
+            
+            response = post_json(self.session, rpc_url, rpc_payload, timeout=30)
+            result = parse_json(response)
+            
+            if 'error' in result:
+                log_message(f"    {token_name}: 获取签名失败: {result['error']}")
+                break
+            
+            signatures = result.get('result', [])
+            if not signatures:
+                complete = True
+                break
+            
+            # 收集签名（按时间倒序返回，遇到早于 since_timestamp 的签名即已衔接上缓存）
+            reached_cached = False
+            for sig in signatures:
+                block_time = sig.get('blockTime')
+                if since_timestamp is not None and block_time is not None and block_time < since_timestamp:
+                    reached_cached = True
+                    break
+                account_signatures.append(sig['signature'])
+            
+            # 如果返回的交易数少于1000，说明已经到达最早记录
+            if reached_cached or len(signatures) < 1000:
+                complete = True
+                break
+            
+            before_signature = signatures[-1]['signature']
+            time.sleep(0.1)
+            
+            # 安全上限，避免无限循环
+            if iteration >= 1000:
+                log_message(f"    {token_name}: 达到1000页上限，停止抓取")
+                break
+        
+        log_message(f"    {token_name}: {len(account_signatures)} 个签名")
+        return account_signatures, complete
+    
     def _fetch_from_excel(self, excel_file: str, days: int) -> pd.DataFrame:
         """从 Excel 文件读取 Solana 数据"""
         log_message(f"  从 Excel 文件读取: {excel_file}")
         
         try:
-            df = pd.read_excel(excel_file)
+            # Excel (openpyxl) 解析很慢：首次读取后保存一份Parquet，之后文件未变更时直接读取Parquet
+            columns = ['Human Time', 'Value', 'Signature', 'From', 'Token Address']
+            parquet_file = os.path.splitext(excel_file)[0] + '.parquet'
+            if os.path.exists(parquet_file) and os.path.getmtime(parquet_file) >= os.path.getmtime(excel_file):
+                df = pd.read_parquet(parquet_file, columns=columns)
+            else:
+                df = pd.read_excel(excel_file, usecols=columns)
+                try:
+                    df.to_parquet(parquet_file, index=False, compression='zstd')
+                except Exception as e:
+                    log_message(f"  保存Parquet副本失败: {e}")
             
             # 转换时间列
             df['DateTime'] = pd.to_datetime(df['Human Time'], errors='coerce')
@@ -811,22 +1198,16 @@ class SolanaFetcher(ChainDataFetcher):
             result['TxHash'] = df['Signature']
             result['From'] = df['From']
             
-            # 识别代币类型
-            USDC_ADDRESS = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
-            GGUSD_ADDRESS = 'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7'
-            USDT_ADDRESS = 'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB'
-            
-            result['Asset'] = df['Token Address'].apply(lambda x: 
-                'USDC' if USDC_ADDRESS in str(x) 
-                else ('GGUSD' if GGUSD_ADDRESS in str(x)
-                else ('USDT' if USDT_ADDRESS in str(x) else 'Other')))
+            # 识别代币类型（Token Address 中包含的 Mint 地址）
+            mint = df['Token Address'].astype(str).str.extract(f"({'|'.join(MINT_TO_ASSET)})", expand=False)
+            result['Asset'] = mint.map(MINT_TO_ASSET).fillna('Other')
             
             # 过滤有效数据
             result = result.dropna(subset=['Amount', 'DateTime'])
             result = result[result['Amount'] > 0]
             
             log_message(f"  Solana: 从 Excel 读取 {len(result)} 条有效交易")
-            return result
+            return apply_column_dtypes(result)
             
         except Exception as e:
             log_message(f"读取 Excel 文件错误: {e}")
@@ -855,9 +1236,9 @@ class SolanaFetcher(ChainDataFetcher):
                     "limit": page_size
                 }
                 
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+                response = self.session.get(url, headers=headers, params=params, timeout=30)
                 response.raise_for_status()
-                transactions = response.json()
+                transactions = parse_json(response)
                 
                 # v1 API 直接返回数组
                 if not transactions or not isinstance(transactions, list):
@@ -888,51 +1269,38 @@ class SolanaFetcher(ChainDataFetcher):
     
     def _process_solscan_data(self, transactions: List[Dict], address: str) -> pd.DataFrame:
         """处理 Solscan API v1 返回的数据"""
-        processed = []
+        if not transactions:
+            return pd.DataFrame()
         
         USDC_ADDRESS = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
         GGUSD_ADDRESS = 'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7'
         
-        for tx in transactions:
-            try:
-                block_time = tx.get('blockTime')
-                if not block_time:
-                    continue
-                
-                # v1 API 中金额已经是正常值
-                amount = float(tx.get('amount', 0))
-                
-                if amount <= 0:
-                    continue
-                
-                # v1 API 中的代币信息
-                token_address = tx.get('tokenAddress', '')
-                if token_address == USDC_ADDRESS:
-                    asset = 'USDC'
-                elif token_address == GGUSD_ADDRESS:
-                    asset = 'GGUSD'
-                else:
-                    asset = 'Other'
-                
-                processed.append({
-                    'DateTime': datetime.fromtimestamp(block_time),
-                    'Amount': amount,
-                    'Asset': asset,
-                    'Chain': 'Solana',
-                    'TxHash': tx.get('txHash', ''),
-                    'From': tx.get('src', 'Unknown')
-                })
-            except Exception as e:
-                continue
+        # 原始记录一次展开为列，缺失的字段补为空列
+        raw = pd.json_normalize(transactions).reindex(
+            columns=['blockTime', 'amount', 'tokenAddress', 'txHash', 'src']
+        )
         
-        if not processed:
+        # v1 API 中金额已经是正常值；缺少时间或金额无效的记录丢弃
+        block_time = pd.to_numeric(raw['blockTime'], errors='coerce')
+        amount = pd.to_numeric(raw['amount'], errors='coerce')
+        valid = block_time.gt(0) & amount.gt(0)
+        if not valid.any():
             return pd.DataFrame()
-        
-        df = pd.DataFrame(processed)
-        df = df[df['Amount'] > 0]
+        raw = raw[valid]
+        
+        df = pd.DataFrame({
+            # 时间戳整列一次转换（替代逐行创建 datetime 对象）
+            'DateTime': pd.to_datetime(block_time[valid].astype('int64'), unit='s'),
+            'Amount': amount[valid],
+            # v1 API 中的代币信息
+            'Asset': raw['tokenAddress'].map({USDC_ADDRESS: 'USDC', GGUSD_ADDRESS: 'GGUSD'}).fillna('Other'),
+            'Chain': 'Solana',
+            'TxHash': raw['txHash'].fillna(''),
+            'From': raw['src'].fillna('Unknown')
+        })
         
         log_message(f"  Solana: 成功获取 {len(df)} 条有效交易")
-        return df
+        return apply_column_dtypes(df)
     
     def _fetch_with_helius(self, address: str, days: int = None) -> pd.DataFrame:
         """使用 Helius Enhanced API 抓取数据（不限制时间范围）"""
@@ -953,9 +1321,9 @@ class SolanaFetcher(ChainDataFetcher):
                 params['before'] = before_signature
             
             try:
-                response = requests.get(url, params=params, timeout=30)
+                response = self.session.get(url, params=params, timeout=30)
                 response.raise_for_status()
-                transactions = response.json()
+                transactions = parse_json(response)
                 
                 if not transactions:
                     break
@@ -1007,20 +1375,25 @@ class SolanaFetcher(ChainDataFetcher):
             }
             
             try:
-                response = requests.post(self.rpc_url, json=payload, timeout=30)
+                response = post_json(self.session, self.rpc_url, payload, timeout=30)
                 response.raise_for_status()
-                data = response.json()
+                data = parse_json(response)
                 
                 signatures = data.get('result', [])
                 
                 if not signatures:
                     break
                 
-                # 获取这批交易的详细信息
-                for sig_info in signatures:
-                    tx_detail = self._get_transaction_detail(sig_info.get('signature'))
-                    if tx_detail:
-                        all_transactions.append(tx_detail)
+                # 获取这批交易的详细信息（每 RPC_BATCH_SIZE 个签名打包为一次批量请求）
+                for i in range(0, len(signatures), self.RPC_BATCH_SIZE):
+                    calls = [
+                        ("getTransaction", [
+                            sig_info.get('signature'),
+                            {"encoding": "jsonParsed", "maxSupportedTransactionVersion": 0}
+                        ])
+                        for sig_info in signatures[i:i + self.RPC_BATCH_SIZE]
+                    ]
+                    all_transactions.extend(self._slim_transaction(tx) for tx in self._rpc_batch(calls) if tx)
                     time.sleep(0.05)  # 减少延迟
                 
                 log_message(f"  Solana: 已获取 {len(all_transactions)} 条交易...")
@@ -1044,6 +1417,97 @@ class SolanaFetcher(ChainDataFetcher):
         
         return self._process_solana_transactions(all_transactions, address)
     
+    def _rpc_call(self, method: str, params: list) -> Optional[Dict]:
+        """发送单个 JSON-RPC 调用，返回 result（失败返回 None）"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": method,
+            "params": params
+        }
+        
+        try:
+            response = self._pool.request(
+                'POST', self.rpc_url, body=orjson.dumps(payload), headers=JSON_HEADERS, timeout=30.0
+            )
+            if response.status >= 400:
+                log_message(f"Solana RPC 请求失败: HTTP {response.status}")
+                return None
+            return orjson.loads(response.data).get('result')
+        except (urllib3.exceptions.HTTPError, orjson.JSONDecodeError) as e:
+            log_message(f"Solana RPC 请求失败: {e}")
+            return None
+    
+    def _rpc_batch(self, calls: List[tuple]) -> List[Optional[Dict]]:
+        """
+        使用 JSON-RPC 2.0 批量请求，一次 POST 发送多个调用
+        
+        Args:
+            calls: (method, params) 列表
+        
+        Returns:
+            与 calls 顺序一致的 result 列表（失败的调用为 None）
+        """
+        if self.rpc_batch_supported:
+            payload = [
+                {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+                for i, (method, params) in enumerate(calls)
+            ]
+            
+            try:
+                response = post_json(self.session, self.rpc_url, payload, timeout=60, stream=True)
+                with response:
+                    if response.status_code == 413:
+                        log_message("  RPC 批量请求过大 (413)，改为并发单次请求")
+                        self.rpc_batch_supported = False
+                    else:
+                        response.raise_for_status()
+                        
+                        # 响应体较大（每个交易含完整指令和账户数据），流式逐条解析，不同时在内存中保留整个响应
+                        # 响应顺序不保证与请求一致，按 id 对应；带 error 的条目视为失败
+                        response.raw.decode_content = True
+                        results_by_id = {}
+                        received = 0
+                        for item in ijson.items(response.raw, 'item', use_float=True):
+                            received += 1
+                            if 'error' not in item:
+                                results_by_id[item.get('id')] = item.get('result')
+                        
+                        if received:
+                            results = [results_by_id.get(i) for i in range(len(calls))]
+                            
+                            # 部分失败（单条限流/超时或响应缺失）时，仅对失败的调用逐个重试
+                            failed = [i for i in range(len(calls)) if i not in results_by_id]
+                            if failed:
+                                log_message(f"  RPC 批量请求中 {len(failed)} 个调用失败，逐个重试")
+                                for i in failed:
+                                    results[i] = self._rpc_call(*calls[i])
+                            return results
+                        
+                        # 不支持批量请求的服务端会返回单个错误对象（不是数组）
+                        log_message("  RPC 不支持批量请求，改为并发单次请求")
+                        self.rpc_batch_supported = False
+            except (requests.exceptions.RequestException, ijson.JSONError) as e:
+                log_message(f"Solana RPC 批量请求失败: {e}")
+                return [None] * len(calls)
+        
+        with ThreadPoolExecutor(max_workers=self.SIGNATURE_CONCURRENCY) as executor:
+            return list(executor.map(lambda call: self._rpc_call(*call), calls))
+    
+    def _slim_transaction(self, tx: Dict) -> Dict:
+        """只保留 _process_solana_transactions 用到的字段，丢弃指令、账户列表、日志等大字段"""
+        meta = tx.get('meta') or {}
+        signatures = (tx.get('transaction') or {}).get('signatures') or ['']
+        return {
+            'blockTime': tx.get('blockTime'),
+            'meta': {
+                'err': meta.get('err'),
+                'preTokenBalances': meta.get('preTokenBalances') or [],
+                'postTokenBalances': meta.get('postTokenBalances') or []
+            },
+            'transaction': {'signatures': signatures[:1]}
+        }
+    
     def _get_transaction_detail(self, signature: str) -> Optional[Dict]:
         """获取交易详情"""
         payload = {
@@ -1056,21 +1520,37 @@ class SolanaFetcher(ChainDataFetcher):
             ]
         }
         
+        # 限流和服务端错误已由会话的重试策略按退避间隔重试（遵循 Retry-After），这里只处理最终失败
         try:
-            response = requests.post(self.rpc_url, json=payload, timeout=30)
+            response = post_json(self.session, self.rpc_url, payload, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = parse_json(response)
             return data.get('result')
-        except:
+        except requests.exceptions.RequestException as e:
+            log_message(f"获取交易详情失败 {signature}: {e}")
             return None
     
     def _process_solana_transactions(self, transactions: List[Dict], address: str) -> pd.DataFrame:
         """处理 Solana 交易数据"""
-        processed = []
-        
-        # USDC 和 GGUSD 的代币地址
+        # 只统计 USDC 和 GGUSD 的转账
         USDC_ADDRESS = 'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v'
         GGUSD_ADDRESS = 'GGUSDyBUPFg5RrgWwqEqhXoha85iYGs6cL57SyK4G2Y7'
+        SUPPORTED_MINTS = {USDC_ADDRESS: 'USDC', GGUSD_ADDRESS: 'GGUSD'}
+        
+        # 逐笔交易只做字段提取，按下标写入预先分配的列数组，金额计算和过滤批量完成
+        # 行数上限为所有交易的 post balance 总数
+        capacity = sum(len((tx.get('meta') or {}).get('postTokenBalances') or []) for tx in transactions if tx)
+        block_times = np.empty(capacity, dtype=np.int64)
+        tx_hashes = np.empty(capacity, dtype=object)
+        assets = np.empty(capacity, dtype=object)
+        post_amounts = np.empty(capacity, dtype=np.float64)
+        pre_amounts = np.empty(capacity, dtype=np.float64)
+        n = 0
+        
+        # 循环内反复调用的函数绑定为局部变量，省去每次的属性查找
+        get_asset = SUPPORTED_MINTS.get
+        get_ui = get_ui_token_amount
+        nan = np.nan
         
         for tx in transactions:
             if not tx:
@@ -1082,49 +1562,58 @@ class SolanaFetcher(ChainDataFetcher):
                     continue
                 
                 meta = tx.get('meta', {})
-                transaction = tx.get('transaction', {})
-                message = transaction.get('message', {})
+                # 失败的交易不改变余额；没有代币余额的交易（如纯 SOL 转账）不含代币转账，均直接跳过
+                if meta.get('err') is not None:
+                    continue
+                post_balances = meta.get('postTokenBalances') or []
+                if not post_balances:
+                    continue
                 
-                # 解析代币转账
-                post_balances = meta.get('postTokenBalances', [])
-                pre_balances = meta.get('preTokenBalances', [])
+                signatures = (tx.get('transaction') or {}).get('signatures')
+                tx_hash = signatures[0] if signatures else ''
                 
+                # 交易前余额按 accountIndex 建索引，每个 post balance 直接查表（替代逐条线性查找）
+                pre_by_idx = {pre.get('accountIndex'): pre for pre in meta.get('preTokenBalances', [])}
+                
+                # 解析代币转账（只有交易前后余额都存在的账户才计算变化）
                 for post in post_balances:
-                    mint = post.get('mint')
-                    account_index = post.get('accountIndex')
-                    
-                    # 查找对应的 pre balance
-                    pre = next((p for p in pre_balances if p.get('accountIndex') == account_index), None)
+                    asset = get_asset(post.get('mint'))
+                    if asset is None:
+                        continue
                     
+                    pre = pre_by_idx.get(post.get('accountIndex'))
                     if pre:
-                        post_amount = float(post.get('uiTokenAmount', {}).get('uiAmount', 0))
-                        pre_amount = float(pre.get('uiTokenAmount', {}).get('uiAmount', 0))
+                        post_amount = get_ui(post).get('uiAmount', 0)
+                        pre_amount = get_ui(pre).get('uiAmount', 0)
                         
-                        amount = post_amount - pre_amount
-                        
-                        # 只保留转入交易
-                        if amount > 0:
-                            asset = 'USDC' if mint == USDC_ADDRESS else ('GGUSD' if mint == GGUSD_ADDRESS else 'Other')
-                            
-                            processed.append({
-                                'DateTime': datetime.fromtimestamp(block_time),
-                                'Amount': amount,
-                                'Asset': asset,
-                                'Chain': 'Solana',
-                                'TxHash': tx.get('transaction', {}).get('signatures', [''])[0],
-                                'From': 'Unknown'  # Solana 的发送者需要更复杂的解析
-                            })
-            except Exception as e:
+                        block_times[n] = block_time
+                        tx_hashes[n] = tx_hash
+                        assets[n] = asset
+                        # uiAmount 为 null 时记为 NaN，后续金额过滤时丢弃
+                        post_amounts[n] = nan if post_amount is None else post_amount
+                        pre_amounts[n] = nan if pre_amount is None else pre_amount
+                        n += 1
+            except (AttributeError, KeyError, TypeError, ValueError, IndexError):
+                # 字段缺失或格式异常的记录直接跳过
                 continue
         
-        if not processed:
+        # 只保留转入交易
+        amounts = post_amounts[:n] - pre_amounts[:n]
+        inflow = amounts > 0
+        if not inflow.any():
             return pd.DataFrame()
         
-        df = pd.DataFrame(processed)
-        df = df[df['Amount'] > 0]
+        df = pd.DataFrame({
+            'DateTime': pd.to_datetime(block_times[:n][inflow], unit='s'),
+            'Amount': amounts[inflow],
+            'Asset': assets[:n][inflow],
+            'Chain': 'Solana',
+            'TxHash': tx_hashes[:n][inflow],
+            'From': 'Unknown'  # Solana 的发送者需要更复杂的解析
+        })
         
         log_message(f"  Solana: 成功获取 {len(df)} 条有效交易")
-        return df
+        return apply_column_dtypes(df)
     
     def _process_solana_data(self, transactions: List[Dict], address: str) -> pd.DataFrame:
         """处理 Helius API 返回的数据"""
@@ -1143,11 +1632,19 @@ class GMTPayDataFetcher:
     # Polygon 注销返还地址 (监控 outflow)
     POLYGON_REFUND_ADDRESS = '0x6f724c70500d899883954a5ac2e6f38d25422f60'
     
+    # 后台刷新缓存时的抓取天数（与看板一致，抓取全部历史）
+    REFRESH_DAYS = 3650
+    
+    # 同一时间只允许一个后台刷新线程（类属性，所有实例共享）
+    _refresh_lock = threading.Lock()
+    
     def __init__(self):
         self.fetchers = {
             'ethereum': MoralisFetcher('ethereum'),
             'bsc': MoralisFetcher('bsc'),
             'polygon': MoralisFetcher('polygon'),
+            # 注销返还的 outflow 与收款 inflow 并发抓取，使用独立的实例，不共享实例状态
+            'polygon_refund': MoralisFetcher('polygon'),
             'solana': SolanaFetcher()
         }
     
@@ -1161,35 +1658,28 @@ class GMTPayDataFetcher:
         Returns:
             合并后的 DataFrame
         """
-        all_data = []
-        
-        # 抓取 EVM 链数据
-        for chain_name in ['ethereum', 'bsc', 'polygon']:
+        # 抓取任务：(描述, 抓取器, 地址, 参数)
+        tasks = [
+            (chain_name, chain_name, self.EVM_ADDRESS, {'days': days})
+            for chain_name in ['ethereum', 'bsc', 'polygon']
+        ]
+        tasks.append(('Solana', 'solana', self.SOLANA_ADDRESS, {'days': days}))
+        # Polygon outflow 数据 (注销返还)
+        tasks.append(('Polygon outflow', 'polygon_refund', self.POLYGON_REFUND_ADDRESS, {'days': days, 'direction': 'outflow'}))
+        
+        def run_task(task):
+            label, fetcher_name, address, kwargs = task
             try:
-                fetcher = self.fetchers[chain_name]
-                df = fetcher.fetch_transactions(self.EVM_ADDRESS, days=days)
-                if not df.empty:
-                    all_data.append(df)
+                return self.fetchers[fetcher_name].fetch_transactions(address, **kwargs)
             except Exception as e:
-                log_message(f"抓取 {chain_name} 数据失败: {e}")
-        
-        # 抓取 Solana 链数据
-        try:
-            solana_fetcher = self.fetchers['solana']
-            df_solana = solana_fetcher.fetch_transactions(self.SOLANA_ADDRESS, days=days)
-            if not df_solana.empty:
-                all_data.append(df_solana)
-        except Exception as e:
-            log_message(f"抓取 Solana 数据失败: {e}")
+                log_message(f"抓取 {label} 数据失败: {e}")
+                return pd.DataFrame()
         
-        # 抓取 Polygon outflow 数据 (注销返还)
-        try:
-            polygon_fetcher = self.fetchers['polygon']
-            df_refund = polygon_fetcher.fetch_transactions(self.POLYGON_REFUND_ADDRESS, days=days, direction='outflow')
-            if not df_refund.empty:
-                all_data.append(df_refund)
-        except Exception as e:
-            log_message(f"抓取 Polygon outflow 数据失败: {e}")
+        # 各链的抓取互不依赖（均为网络等待），并发执行，总耗时约等于最慢的一条链
+        with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+            all_data = [
+                self._drop_duplicate_transfers(df) for df in executor.map(run_task, tasks) if not df.empty
+            ]
         
         # 合并所有数据
         if not all_data:
@@ -1197,11 +1687,27 @@ class GMTPayDataFetcher:
             return pd.DataFrame()
         
         combined_df = pd.concat(all_data, ignore_index=True)
-        combined_df = combined_df.sort_values('DateTime', ascending=False)
+        # 部分数据源（如 Solana RPC / Solscan）没有 Direction 列，合并时该列会退化为 object，统一转回 category
+        combined_df = apply_column_dtypes(combined_df)
+        
+        # 各链结果本身基本按时间倒序，合并后是若干有序段；稳定排序（timsort）会利用已有的有序段，接近线性时间
+        combined_df = combined_df.sort_values('DateTime', ascending=False, kind='stable')
         
         log_message(f"\n成功! 总计获取 {len(combined_df)} 条交易记录")
         return combined_df
     
+    @staticmethod
+    def _drop_duplicate_transfers(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        去掉单个抓取任务中分页重叠重复返回的转账
+        
+        只按真实的转账标识 (TxHash, LogIndex) 去重：同一交易中金额、地址都相同的多笔转账是不同的转账，不能合并。
+        没有日志序号的结果（如 Solana，抓取时已按签名集合去重）无法区分重复返回和真实的重复转账，原样返回
+        """
+        if 'LogIndex' not in df.columns or df['LogIndex'].isna().any():
+            return df
+        return df.drop_duplicates(subset=['TxHash', 'LogIndex'], keep='first')
+    
     def save_to_cache(self, df: pd.DataFrame, cache_file: str = 'chain_data_cache.csv'):
         """保存数据到缓存文件"""
         try:
@@ -1209,15 +1715,27 @@ class GMTPayDataFetcher:
             log_message(f"数据已保存到缓存: {cache_file}")
         except Exception as e:
             log_message(f"保存缓存失败: {e}")
+        
+        # 同时保存一份Parquet（列式、带类型），供分析脚本快速读取
+        parquet_file = os.path.splitext(cache_file)[0] + '.parquet'
+        try:
+            df.to_parquet(parquet_file, index=False, compression='zstd')
+            log_message(f"数据已保存到缓存: {parquet_file}")
+        except Exception as e:
+            log_message(f"保存Parquet缓存失败: {e}")
     
     def load_from_cache(self, cache_file: str = 'chain_data_cache.csv', 
-                       max_age_minutes: int = 30) -> Optional[pd.DataFrame]:
+                       max_age_minutes: int = 30,
+                       stale_max_age_minutes: int = 180) -> Optional[pd.DataFrame]:
         """
         从缓存加载数据
         
+        缓存超过有效期但未超过最长可用时间时，仍直接返回旧数据，同时在后台线程刷新缓存
+        
         Args:
             cache_file: 缓存文件路径
             max_age_minutes: 缓存有效期（分钟）
+            stale_max_age_minutes: 过期缓存的最长可用时间（分钟），超过后返回 None，需同步抓取
         
         Returns:
             DataFrame 或 None
@@ -1227,18 +1745,40 @@ class GMTPayDataFetcher:
         
         # 检查缓存文件年龄
         file_age = time.time() - os.path.getmtime(cache_file)
-        if file_age > max_age_minutes * 60:
-            log_message(f"缓存已过期 (超过 {max_age_minutes} 分钟)")
+        if file_age > stale_max_age_minutes * 60:
+            log_message(f"缓存已过期 (超过 {stale_max_age_minutes} 分钟)")
             return None
         
+        if file_age > max_age_minutes * 60:
+            # 已有刷新线程在运行时不再重复启动
+            if self._refresh_lock.acquire(blocking=False):
+                log_message(f"缓存已超过 {max_age_minutes} 分钟，先返回旧数据并在后台刷新")
+                threading.Thread(target=self._refresh_cache, args=(cache_file,), daemon=True).start()
+        
         try:
-            df = pd.read_csv(cache_file, encoding='utf-8-sig')
-            df['DateTime'] = pd.to_datetime(df['DateTime'])
+            # 优先读取同时保存的Parquet（带类型，无需解析文本和日期）；不存在或比CSV旧时回退到CSV
+            parquet_file = os.path.splitext(cache_file)[0] + '.parquet'
+            if os.path.exists(parquet_file) and os.path.getmtime(parquet_file) >= os.path.getmtime(cache_file):
+                df = pd.read_parquet(parquet_file)
+            else:
+                df = pd.read_csv(cache_file, encoding='utf-8-sig')
+                df['DateTime'] = pd.to_datetime(df['DateTime'])
             log_message(f"从缓存加载了 {len(df)} 条记录 (缓存年龄: {file_age/60:.1f} 分钟)")
             return df
         except Exception as e:
             log_message(f"加载缓存失败: {e}")
             return None
+    
+    def _refresh_cache(self, cache_file: str):
+        """后台重新抓取所有链并覆盖缓存（由 load_from_cache 启动，结束时释放刷新锁）"""
+        try:
+            df = self.fetch_all_chains(days=self.REFRESH_DAYS)
+            if not df.empty:
+                self.save_to_cache(df, cache_file)
+        except Exception as e:
+            log_message(f"后台刷新缓存失败: {e}")
+        finally:
+            self._refresh_lock.release()
 
 
 def main():
@@ -1,78 +1,146 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from pyarrow import compute as pc
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import os
-from chain_data_fetcher import GMTPayDataFetcher
+import hashlib
+import binascii
+from concurrent.futures import ThreadPoolExecutor
+from chain_data_fetcher import GMTPayDataFetcher, apply_column_dtypes
+
+# NFT持有者TSV列名（文件无表头）
+NFT_OWNER_COLUMNS = ['nft_contract', 'chain', 'asset_or_token_id', 'holder_address']
+
+# NFT持有者数据中的链代码 → 显示名称（未列出的转为大写）
+LOYAL_CHAIN_DISPLAY = {
+    'bnb': 'BNB Chain',
+    'pol': 'Polygon',
+    'sol': 'Solana'
+}
 
-def get_loyal_vip_addresses():
-    """获取最忠诚VIP用户地址（在所有13周都持有NFT的用户）"""
+# 第1-13周NFT持有者数据文件名（第13周的文件名沿用 "13rd"）
+WEEK_ORDINAL_SUFFIXES = {1: 'st', 2: 'nd', 3: 'rd'}
+NFT_OWNER_WEEK_FILES = [
+    f'nft-owners-{week}{WEEK_ORDINAL_SUFFIXES.get(week, "th")} week.tsv' for week in range(1, 13)
+] + ['nft-owners-13rd week.tsv']
+
+# 最忠诚VIP地址计算结果的磁盘缓存目录（与抓取器的转账缓存共用）
+LOYAL_VIP_CACHE_DIR = 'cache'
+
+# 周数位掩码：第 w 周对应第 w-1 位，13周全部持有时为 0x1FFF
+ALL_WEEKS_MASK = (1 << 13) - 1
+
+def get_nft_owner_files():
+    """返回存在的各周NFT持有者数据文件 [(周, 文件名)]"""
+    return [
+        (week, filename)
+        for week, filename in enumerate(NFT_OWNER_WEEK_FILES, start=1)
+        if os.path.exists(filename)
+    ]
+
+def read_nft_owner_week(week, filename):
+    """
+    使用PyArrow解析单周的NFT持有者数据（只读取链和持有者两列，按字符串读取）
+    
+    Returns:
+        本周去重后的 (chain, holder_address) 表（均已转小写），附加本周的位掩码列 week_bit
+    """
+    table = pacsv.read_csv(
+        filename,
+        read_options=pacsv.ReadOptions(column_names=NFT_OWNER_COLUMNS),
+        # 列数不完整的行（如被锁定的NFT没有持有者）直接跳过
+        parse_options=pacsv.ParseOptions(delimiter='\t', invalid_row_handler=lambda row: 'skip'),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=['chain', 'holder_address'],
+            column_types={'chain': pa.string(), 'holder_address': pa.string()},
+            strings_can_be_null=True
+        )
+    )
+    
+    # 跳过被锁定的NFT（持有者地址为空）
+    table = table.drop_null()
+    
+    # 同一地址在一周内可能持有多个NFT，先在本周内去重
+    table = pa.table({
+        'chain': pc.utf8_lower(table['chain']),
+        'holder_address': pc.utf8_lower(table['holder_address'])
+    }).group_by(['chain', 'holder_address']).aggregate([])
+    return table.append_column('week_bit', pa.repeat(pa.scalar(1 << (week - 1), pa.uint16()), table.num_rows))
+
+@st.cache_data(ttl=3600, max_entries=4)  # 缓存1小时；以文件修改时间和大小为参数，文件更新后自动失效
+def compute_loyal_vip_addresses(file_signatures):
+    """
+    计算在所有13周都持有NFT的地址
+    
+    结果按各周文件的签名落盘为Parquet，文件未变化时（包括应用重启后）直接读取，不再解析13个TSV
+    
+    Args:
+        file_signatures: ((周, 文件名, 修改时间, 文件大小), ...)
+    """
+    signature_hash = hashlib.sha256(repr(file_signatures).encode('utf-8')).hexdigest()
+    cache_path = os.path.join(LOYAL_VIP_CACHE_DIR, f'loyal_vip_{signature_hash[:16]}.parquet')
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path)
+        except (OSError, pa.ArrowException):
+            pass  # 缓存损坏时重新计算
+    
+    df_loyal = build_loyal_vip_addresses(file_signatures)
     try:
-        # 读取所有周的NFT持有者数据
-        all_addresses = {}  # {chain: {address: set(weeks)}}
+        os.makedirs(LOYAL_VIP_CACHE_DIR, exist_ok=True)
+        df_loyal.to_parquet(cache_path, index=False)
+    except (OSError, pa.ArrowException):
+        pass  # 缓存写入失败不影响结果
+    return df_loyal
+
+def build_loyal_vip_addresses(file_signatures):
+    """解析各周NFT持有者数据，找出在所有13周都持有NFT的地址"""
+    # 各周文件互不依赖，并发解析（PyArrow解析时释放GIL，读取和解析可以重叠）
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        week_tables = list(executor.map(
+            lambda signature: read_nft_owner_week(*signature[:2]), file_signatures
+        ))
+    
+    if week_tables:
+        table_all = pa.concat_tables(week_tables)
+        # 链只有几种取值，字典编码后分组时按整数编码比较；地址保持Arrow字符串，不转为Python对象
+        table_all = pa.table({
+            'chain': pc.dictionary_encode(table_all['chain']),
+            'holder_address': table_all['holder_address'],
+            'week_bit': table_all['week_bit']
+        })
         
-        for week in range(1, 14):  # 1-13周
-            if week == 13:
-                filename = 'nft-owners-13rd week.tsv'
-            else:
-                filename = f'nft-owners-{week}{"st" if week == 1 else "nd" if week == 2 else "rd" if week == 3 else "th"} week.tsv'
-            if not os.path.exists(filename):
-                continue
-                
-            df_week = pd.read_csv(filename, sep='\t', header=None)
-            df_week.columns = ['nft_contract', 'chain', 'asset_or_token_id', 'holder_address']
-            
-            for _, row in df_week.iterrows():
-                if pd.isna(row.get('chain')) or pd.isna(row.get('holder_address')):
-                    continue
-                    
-                chain = str(row['chain']).lower()
-                holder_address = row['holder_address']
-                
-                # 跳过被锁定的NFT（持有者地址为NaN）
-                if pd.isna(holder_address):
-                    continue
-                    
-                address = str(holder_address).lower()
-                
-                if chain not in all_addresses:
-                    all_addresses[chain] = {}
-                
-                if address not in all_addresses[chain]:
-                    all_addresses[chain][address] = set()
-                
-                all_addresses[chain][address].add(week)
-        
-        # 找出在所有13周都出现的地址（去重后）
-        loyal_addresses = []
+        # 找出在所有13周都出现的地址：各周已去重，每个地址的周位掩码之和即为按位或，13位全满即为全部持有
+        weeks_held = table_all.group_by(['chain', 'holder_address']).aggregate([('week_bit', 'sum')])
+        loyal = weeks_held.filter(pc.equal(weeks_held['week_bit_sum'], ALL_WEEKS_MASK)).to_pandas()
         
-        for chain, addresses in all_addresses.items():
-            loyal_count = 0
-            for address, weeks in addresses.items():
-                if len(weeks) == 13:  # 在所有13周都出现
-                    # 保持原始链名称
-                    chain_display = {
-                        'bnb': 'BNB Chain',
-                        'pol': 'Polygon', 
-                        'sol': 'Solana'
-                    }.get(chain, chain.upper())
-                    
-                    loyal_addresses.append({
-                        '链类型': chain_display,
-                        '地址': address
-                    })
-                    loyal_count += 1
-            
-        if loyal_addresses:
-            df_loyal = pd.DataFrame(loyal_addresses)
+        if not loyal.empty:
+            chain = loyal['chain'].astype(str)
+            df_loyal = pd.DataFrame({
+                # 保持原始链名称
+                '链类型': chain.map(LOYAL_CHAIN_DISPLAY).fillna(chain.str.upper()),
+                '地址': loyal['holder_address']
+            })
             df_loyal = df_loyal.sort_values(['链类型', '地址'])
             return df_loyal
-        else:
-            # 如果没有找到，返回空DataFrame
-            return pd.DataFrame(columns=['链类型', '地址'])
-            
-    except Exception as e:
+    
+    # 如果没有找到，返回空DataFrame
+    return pd.DataFrame(columns=['链类型', '地址'])
+
+def get_loyal_vip_addresses():
+    """获取最忠诚VIP用户地址（在所有13周都持有NFT的用户）"""
+    try:
+        file_signatures = tuple(
+            (week, filename, os.path.getmtime(filename), os.path.getsize(filename))
+            for week, filename in get_nft_owner_files()
+        )
+        return compute_loyal_vip_addresses(file_signatures)
+    except (OSError, pa.ArrowException) as e:  # 只处理文件读取/解析失败，代码错误直接暴露
         st.error(f"获取最忠诚VIP用户地址失败: {e}")
         return pd.DataFrame(columns=['链类型', '地址'])
 
@@ -102,24 +170,23 @@ CHAIN_COLORS = {
 }
 
 
+# 链名称（小写）及常见别名 -> 颜色，模块加载时构建一次，按链取色只需一次字典查找
+CHAIN_ALIASES = {
+    'ethereum': ['eth'],
+    'bnb chain': ['bnb', 'bsc', 'bnb smart chain', 'binance smart chain'],
+    'polygon': ['matic', 'polygon pos'],
+    'solana': ['sol']
+}
+CHAIN_COLOR_LOOKUP = {
+    alias: CHAIN_COLORS[chain]['color']
+    for chain, aliases in CHAIN_ALIASES.items()
+    for alias in [chain, *aliases]
+}
+DEFAULT_CHAIN_COLOR = '#5B93FF'
+
 def get_chain_color_map(chains):
     """为给定的链列表生成颜色映射"""
-    color_map = {}
-    for chain in chains:
-        chain_lower = chain.lower()
-        if chain_lower in CHAIN_COLORS:
-            color_map[chain] = CHAIN_COLORS[chain_lower]['color']
-        elif 'bnb' in chain_lower or 'bsc' in chain_lower:
-            color_map[chain] = CHAIN_COLORS['bnb chain']['color']
-        elif 'polygon' in chain_lower:
-            color_map[chain] = CHAIN_COLORS['polygon']['color']
-        elif 'ethereum' in chain_lower or 'eth' in chain_lower:
-            color_map[chain] = CHAIN_COLORS['ethereum']['color']
-        elif 'solana' in chain_lower or 'sol' in chain_lower:
-            color_map[chain] = CHAIN_COLORS['solana']['color']
-        else:
-            color_map[chain] = '#5B93FF'
-    return color_map
+    return {chain: CHAIN_COLOR_LOOKUP.get(chain.lower(), DEFAULT_CHAIN_COLOR) for chain in chains}
 
 # 多语言文本配置
 TRANSLATIONS = {
@@ -403,9 +470,13 @@ TRANSLATIONS = {
     }
 }
 
+# 各语言的翻译表（get_text 每次渲染调用上百次，预先取出避免重复查找和回退）
+# 按 (语言, 键) 展开为一张表，取文本只需一次字典查找
+TEXTS = {(lang, key): text for lang, texts in TRANSLATIONS.items() for key, text in texts.items()}
+
 def get_text(key, lang='zh'):
-    """获取指定语言的文本"""
-    return TRANSLATIONS.get(lang, TRANSLATIONS['zh']).get(key, key)
+    """获取指定语言的文本（未知语言或缺失的键回退到中文，都没有时返回键本身）"""
+    return TEXTS.get((lang, key)) or TEXTS.get(('zh', key), key)
 
 # 页面配置
 st.set_page_config(
@@ -416,7 +487,8 @@ st.set_page_config(
 )
 
 # 🎨 Tailwind-inspired Modern UI System
-st.markdown("""
+# 样式表为模块级常量；每次重新运行都必须重新输出（Streamlit 会清除本次运行未输出的元素），不能只注入一次
+APP_CSS = """
 <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700;800;900&display=swap');
     
@@ -728,7 +800,8 @@ st.markdown("""
         border: 1px solid #e2e8f0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # 标题和产品信息 (将在数据加载后显示)
 
@@ -740,8 +813,17 @@ CARD_DENOMINATIONS = {
     '200 USD': {'min': 195, 'max': 212, 'value': 200},
     '300 USD': {'min': 295, 'max': 318, 'value': 300}
 }
+# 面值区间（闭区间 [min, max]，按下限升序排列）的查表数组
+CARD_VALUE_MINS = np.array([d['min'] for d in CARD_DENOMINATIONS.values()], dtype=float)
+CARD_VALUE_MAXS = np.array([d['max'] for d in CARD_DENOMINATIONS.values()], dtype=float)
+# 面值均为不超过几百的整数，用int16存储
+CARD_VALUES = np.array([d['value'] for d in CARD_DENOMINATIONS.values()], dtype=np.int16)
 
 SUPPORTED_CHAINS = ['Ethereum', 'BNB Chain', 'Polygon', 'Solana']
+# 链数据的链名称固定为以上几种，颜色映射在模块加载时生成一次，各图表共用
+CHAIN_COLOR_MAP = get_chain_color_map(SUPPORTED_CHAINS)
+# 高基数的哈希/地址列，使用Arrow字符串存储（连续缓冲区，缓存读写时无需逐个序列化Python字符串）
+ARROW_STRING_COLUMNS = ['TxHash', 'From', 'To']
 SUPPORTED_TOKENS = ['GGUSD', 'USDT', 'USDC']
 
 # 缓存数据加载函数
@@ -761,6 +843,21 @@ def load_chain_data(force_refresh=False):
             fetcher.save_to_cache(df)
         return df
 
+@st.cache_data(ttl=1800)  # 缓存30分钟；以文件修改时间为参数，文件更新后自动失效
+def load_cached_raw_data(cache_file, mtime):
+    """
+    读取链上数据缓存文件
+    
+    优先读取抓取器同时保存的Parquet（带类型，无需解析文本和日期）；不存在或比CSV旧时回退到CSV
+    （日期在读取时直接解析，低基数的 Asset/Chain/Direction 转为与抓取器一致的固定类别 category）
+    """
+    parquet_file = os.path.splitext(cache_file)[0] + '.parquet'
+    if os.path.exists(parquet_file) and os.path.getmtime(parquet_file) >= mtime:
+        df = pd.read_parquet(parquet_file)
+    else:
+        df = apply_column_dtypes(pd.read_csv(cache_file, parse_dates=['DateTime']))
+    return df.astype({col: 'string[pyarrow]' for col in ARROW_STRING_COLUMNS if col in df.columns})
+
 @st.cache_data(ttl=1800)  # 缓存30分钟
 def load_refund_data(force_refresh=False):
     """加载注销返还数据 (从主数据中提取 Polygon outflow)"""
@@ -779,12 +876,17 @@ def load_refund_data(force_refresh=False):
         st.error(f"获取注销返还数据失败: {e}")
         return pd.DataFrame()
 
-def determine_card_value(amount):
-    """根据支付金额确定卡片面值"""
-    for card_name, range_info in CARD_DENOMINATIONS.items():
-        if range_info['min'] <= amount <= range_info['max']:
-            return range_info['value']
-    return 0  # 无法识别的金额
+def determine_card_value(amounts):
+    """根据支付金额确定卡片面值（向量化分桶，无法识别的金额返回0）"""
+    amounts = np.asarray(amounts, dtype=float)
+    # 找到下限不大于金额的最后一个区间，再检查是否落在该区间上限内
+    idx = np.searchsorted(CARD_VALUE_MINS, amounts, side='right') - 1
+    safe_idx = idx.clip(min=0)
+    in_range = (idx >= 0) & (amounts <= CARD_VALUE_MAXS[safe_idx])
+    return np.where(in_range, CARD_VALUES[safe_idx], 0)
+
+# VIP购卡数据中的日期列（CSV读取时由PyArrow直接解析）
+VIP_DATE_COLUMNS = ['DateTime', 'Date']
 
 @st.cache_data(ttl=1800)  # 缓存30分钟
 def load_vip_analysis():
@@ -797,45 +899,169 @@ def load_vip_analysis():
         if hasattr(st, 'secrets') and 'VIP_DATA_BASE64' in st.secrets:
             encoded_data = st.secrets['VIP_DATA_BASE64']
             decoded_data = base64.b64decode(encoded_data).decode('utf-8')
-            df = pd.read_csv(StringIO(decoded_data))
-            df['DateTime'] = pd.to_datetime(df['DateTime'])
-            df['Date'] = pd.to_datetime(df['Date'])
+            df = pd.read_csv(StringIO(decoded_data), engine='pyarrow', parse_dates=VIP_DATE_COLUMNS)
             return df
-    except Exception:
-        pass
+    except (FileNotFoundError, binascii.Error, UnicodeDecodeError, pd.errors.ParserError, pa.ArrowException):
+        pass  # 未配置Secrets或其中的数据无法解码/解析时，回退到本地文件
     
-    # 尝试从本地文件读取
+    # 尝试从本地文件读取（优先读取分析脚本同时输出的Parquet副本，仅当它不比CSV旧时使用）
     vip_file = 'vip_users_purchases.csv'
-    if os.path.exists(vip_file):
+    vip_parquet_file = 'vip_users_purchases.parquet'
+    if os.path.exists(vip_parquet_file) and (
+        not os.path.exists(vip_file)
+        or os.path.getmtime(vip_parquet_file) >= os.path.getmtime(vip_file)
+    ):
         try:
-            df = pd.read_csv(vip_file)
+            df = pd.read_parquet(vip_parquet_file)
             df['DateTime'] = pd.to_datetime(df['DateTime'])
             df['Date'] = pd.to_datetime(df['Date'])
             return df
-        except Exception as e:
+        except (OSError, pa.ArrowException) as e:
+            st.error(f"加载VIP数据失败: {e}")
+    
+    if os.path.exists(vip_file):
+        try:
+            df = pd.read_csv(vip_file, engine='pyarrow', parse_dates=VIP_DATE_COLUMNS)
+            return df
+        except (OSError, pd.errors.ParserError, UnicodeDecodeError, pa.ArrowException) as e:
             st.error(f"加载VIP数据失败: {e}")
     
     return None
 
-def process_data(df):
-    """处理数据，添加业务字段"""
+@st.cache_data(ttl=1800)  # 缓存30分钟；原始数据不变时，页面交互重跑脚本不再重复处理
+def process_data(_df, data_version):
+    """
+    处理数据，添加业务字段
+    
+    Args:
+        _df: 原始链上数据（参数名以下划线开头，st.cache_data 不对整张表计算哈希）
+        data_version: 原始数据版本（缓存文件修改时间等），作为缓存键
+    """
+    df = _df
     if df.empty:
         return df
     
-    # 过滤异常值并添加业务字段
-    df = df[(df['Amount'] > 0) & (df['Amount'] < 10000)].copy()
+    # 过滤条件合并为一个掩码，只复制一次：
+    # 过滤异常值，只保留inflow交易（转入交易）和使用支持代币的交易（USDC, USDT, GGUSD）
+    supported_tokens = ['USDC', 'USDT', 'GGUSD']
+    mask = (
+        df['Amount'].between(0, 10000, inclusive='neither')
+        & df['Direction'].eq('inflow')
+        & df['Asset'].isin(supported_tokens)
+    )
+    df = df.loc[mask].copy()
+    
+    amount = df['Amount'].to_numpy(dtype=float)
+    card_value = determine_card_value(amount)
+    recognized = card_value > 0
+    fee = np.where(recognized, amount - card_value, 0.0)
+    
+    df['Card_Value'] = card_value
+    df['Fee'] = fee
+    # 无法识别面值的交易手续费比例记为0（分母替换为1避免除零）；
+    # 费率只用于展示（保留两位小数）和直方图，float32精度足够；金额和手续费需要累加，保持float64
+    df['Fee_Percentage'] = np.where(recognized, fee / np.where(recognized, card_value, 1) * 100, 0.0).astype(np.float32)
+    # 日期只在筛选后的数据上计算一次（datetime64截断到零点，不生成逐行的Python date对象），下游按日汇总直接使用
+    df['Date'] = df['DateTime'].dt.normalize()
+    return df
+
+@st.cache_data(ttl=1800, max_entries=32, show_spinner=False)  # 筛选条件不变时重跑脚本直接复用结果
+def apply_filters(_df, data_version, start_date=None, end_date=None, chains=None, card_values=None, assets=None):
+    """
+    按侧边栏条件筛选卡片数据，所有条件合并为一个掩码后只切片一次
+    
+    Args:
+        _df: 有效卡片数据（不参与缓存键的哈希）
+        data_version: 原始数据版本，与各筛选条件一起作为缓存键
+        start_date, end_date: 日期范围（包含两端），为None时不按日期筛选
+        chains, card_values, assets: 选中的链/面值/代币元组，为None时不筛选该项
+    """
+    df = _df
+    mask = np.ones(len(df), dtype=bool)
+    if start_date is not None and end_date is not None:
+        # 直接与时间戳比较（结束日期取次日零点之前），避免逐行转换为Python date对象
+        date_time = df['DateTime']
+        mask &= (date_time >= pd.Timestamp(start_date)).to_numpy()
+        mask &= (date_time < pd.Timestamp(end_date) + pd.Timedelta(days=1)).to_numpy()
+    if chains is not None:
+        mask &= df['Chain'].isin(chains).to_numpy()
+    if card_values is not None:
+        mask &= df['Card_Value'].isin(card_values).to_numpy()
+    if assets is not None:
+        mask &= df['Asset'].isin(assets).to_numpy()
+    return df.loc[mask]
+
+# 手续费率分布图的分箱数
+FEE_RATE_HIST_BINS = 50
+
+@st.cache_data(ttl=1800, max_entries=32, show_spinner=False)
+def compute_aggregates(_df, data_version, filters):
+    """
+    一次性计算看板各部分所需的汇总数据，页面各图表只读取结果，不再各自对筛选结果分组
+    
+    Args:
+        _df: 筛选后的卡片数据（不参与缓存键的哈希）
+        data_version: 原始数据版本
+        filters: 得到 _df 所用的筛选条件元组，与 data_version 一起作为缓存键
     
-    # 只保留inflow交易（转入交易）
-    df = df[df['Direction'] == 'inflow'].copy()
+    Returns:
+        {'totals': 总体指标, 'by_chain'/'by_card_value'/'by_date'/'by_asset'/'by_asset_chain': 分组汇总,
+         'heatmap': 各链各面值销量, 'fee_pct_hist': 手续费率直方图 (各箱计数, 箱边界)}
+    """
+    df = _df
+    fee_percentage = df['Fee_Percentage']
+    totals = {
+        'count': len(df),
+        'card_value_sum': df['Card_Value'].sum(),
+        'amount_sum': df['Amount'].sum(),
+        'fee_sum': df['Fee'].sum(),
+        'fee_mean': df['Fee'].mean(),
+        'fee_pct_mean': fee_percentage.mean(),
+        'fee_pct_min': fee_percentage.min(),
+        'fee_pct_max': fee_percentage.max(),
+        'fee_pct_median': fee_percentage.median()
+    }
+    # 手续费率直方图在服务端分箱，图表只传50个柱子而不是整列数据
+    fee_pct_hist = np.histogram(fee_percentage.to_numpy(), bins=FEE_RATE_HIST_BINS)
+    
+    # 各链的销量、面值、收入、手续费和平均费率由一次分组得到，饼图、明细表和费率图共用
+    by_chain = df.groupby('Chain', observed=True).agg(
+        Count=('Card_Value', 'size'),
+        Card_Value=('Card_Value', 'sum'),
+        Amount=('Amount', 'sum'),
+        Fee=('Fee', 'sum'),
+        Fee_Percentage=('Fee_Percentage', 'mean')
+    )
+    by_card_value = df.groupby('Card_Value', observed=True).agg(
+        Count=('Card_Value', 'size'),
+        Amount=('Amount', 'sum')
+    )
+    by_date = df.groupby('Date').agg(
+        Cards_Count=('Card_Value', 'size'),
+        Revenue=('Amount', 'sum')
+    )
+    heatmap = df.groupby(['Chain', 'Card_Value'], observed=True).size()
     
-    # 只保留使用支持代币的交易（USDC, USDT, GGUSD）
-    supported_tokens = ['USDC', 'USDT', 'GGUSD']
-    df = df[df['Asset'].isin(supported_tokens)].copy()
+    df_target_assets = df[df['Asset'].isin(SUPPORTED_TOKENS)]
+    by_asset = df_target_assets.groupby('Asset', observed=True).agg(
+        Count=('Amount', 'size'),
+        Amount=('Amount', 'sum')
+    )
+    by_asset_chain = df_target_assets.groupby(['Asset', 'Chain'], observed=True).agg(
+        Count=('Amount', 'size'),
+        Amount=('Amount', 'sum')
+    )
     
-    df['Card_Value'] = df['Amount'].apply(determine_card_value)
-    df['Fee'] = df.apply(lambda row: row['Amount'] - row['Card_Value'] if row['Card_Value'] > 0 else 0, axis=1)
-    df['Fee_Percentage'] = df.apply(lambda row: (row['Fee'] / row['Card_Value'] * 100) if row['Card_Value'] > 0 else 0, axis=1)
-    return df
+    return {
+        'totals': totals,
+        'by_chain': by_chain,
+        'by_card_value': by_card_value,
+        'by_date': by_date,
+        'heatmap': heatmap,
+        'by_asset': by_asset,
+        'by_asset_chain': by_asset_chain,
+        'fee_pct_hist': fee_pct_hist
+    }
 
 # 初始化session state中的语言设置
 if 'language' not in st.session_state:
@@ -864,10 +1090,10 @@ if st.sidebar.button(get_text('refresh_data', lang), use_container_width=True):
     st.success("数据已刷新!")
 
 # 尝试加载缓存数据，如果不存在则自动抓取
+# data_version 标识当前原始数据的版本，下游缓存以它为键，不对整张表计算哈希
 try:
-    df_raw = pd.read_csv('chain_data_cache.csv')
-    df_raw['DateTime'] = pd.to_datetime(df_raw['DateTime'])
-    df_raw['Date'] = df_raw['DateTime'].dt.date
+    data_version = os.path.getmtime('chain_data_cache.csv')
+    df_raw = load_cached_raw_data('chain_data_cache.csv', data_version)
     st.success(f"✅ 已加载缓存数据: {len(df_raw):,} 条交易记录")
 except FileNotFoundError:
     st.info("📡 未找到缓存数据，正在自动抓取链上数据...")
@@ -876,6 +1102,11 @@ except FileNotFoundError:
         df_raw = load_chain_data(force_refresh=True)
         if not df_raw.empty:
             st.success(f"✅ 数据抓取成功: {len(df_raw):,} 条交易记录")
+            # 抓取结果通常已写入缓存文件，以其修改时间为版本；写入失败时用记录数和最新时间区分
+            if os.path.exists('chain_data_cache.csv'):
+                data_version = os.path.getmtime('chain_data_cache.csv')
+            else:
+                data_version = ('fetched', len(df_raw), df_raw['DateTime'].max())
         else:
             st.error("❌ 数据抓取失败，未获取到任何数据")
             st.stop()
@@ -899,7 +1130,7 @@ if df_raw.empty:
     st.stop()
 
 # 处理数据
-df = process_data(df_raw)
+df = process_data(df_raw, data_version)
 
 if df.empty:
     st.warning("数据加载成功，但没有有效的交易记录")
@@ -914,7 +1145,8 @@ if os.path.exists(cache_file):
     st.sidebar.info(status_text)
 
 # 过滤出有效卡片（能识别出面值的）
-df_valid = df[df['Card_Value'] > 0].copy()
+# 下游只读取不修改，无需复制
+df_valid = df[df['Card_Value'] > 0]
 
 # 侧边栏 - 筛选器
 st.sidebar.header("🔍 " + ("数据筛选" if lang == 'zh' else "Data Filters"))
@@ -930,32 +1162,32 @@ date_range = st.sidebar.date_input(
     max_value=max_date
 )
 
-if len(date_range) == 2:
-    start_date, end_date = date_range
-    df_filtered = df_valid[(df_valid['DateTime'].dt.date >= start_date) & (df_valid['DateTime'].dt.date <= end_date)]
-else:
-    df_filtered = df_valid
+start_date, end_date = date_range if len(date_range) == 2 else (None, None)
 
 # 筛选器
 all_text = '全部' if lang == 'zh' else 'All'
 
+def selected_filter(selected):
+    """多选框的选择转为筛选条件元组（选择“全部”或未选择时为None，表示不筛选）"""
+    if all_text in selected or not selected:
+        return None
+    return tuple(sorted(selected))
+
 # 链筛选
 selected_chains = st.sidebar.multiselect(
     "选择区块链" if lang == 'zh' else "Select Blockchain",
     options=[all_text] + SUPPORTED_CHAINS,
     default=[all_text]
 )
-if all_text not in selected_chains and selected_chains:
-    df_filtered = df_filtered[df_filtered['Chain'].isin(selected_chains)]
+chain_filter = selected_filter(selected_chains)
 
-# 卡片面值筛选
+# 卡片面值筛选（可选面值取自按日期和链筛选后的数据）
+card_value_options = apply_filters(df_valid, data_version, start_date, end_date, chain_filter)['Card_Value'].unique()
 card_values = st.sidebar.multiselect(
     "选择卡片面值" if lang == 'zh' else "Select Card Value",
-    options=[all_text] + sorted(df_filtered['Card_Value'].unique()),
+    options=[all_text] + sorted(card_value_options.tolist()),
     default=[all_text]
 )
-if all_text not in card_values and card_values:
-    df_filtered = df_filtered[df_filtered['Card_Value'].isin(card_values)]
 
 # Asset 筛选
 selected_assets = st.sidebar.multiselect(
@@ -963,16 +1195,19 @@ selected_assets = st.sidebar.multiselect(
     options=[all_text] + SUPPORTED_TOKENS,
     default=[all_text]
 )
-if all_text not in selected_assets and selected_assets:
-    df_filtered = df_filtered[df_filtered['Asset'].isin(selected_assets)]
+
+filters = (start_date, end_date, chain_filter, selected_filter(card_values), selected_filter(selected_assets))
+df_filtered = apply_filters(df_valid, data_version, *filters)
+aggregates = compute_aggregates(df_filtered, data_version, filters)
+totals = aggregates['totals']
 
 # 显示筛选后的数据统计
 st.sidebar.markdown("---")
 st.sidebar.markdown("### 📊 " + ("筛选结果" if lang == 'zh' else "Filter Results"))
-st.sidebar.metric("卡片销售数量" if lang == 'zh' else "Card Sales", len(df_filtered))
-st.sidebar.metric("卡片总面值" if lang == 'zh' else "Total Card Value", f"${df_filtered['Card_Value'].sum():,.0f}")
-st.sidebar.metric("实际收入" if lang == 'zh' else "Actual Revenue", f"${df_filtered['Amount'].sum():,.2f}")
-st.sidebar.metric("手续费收入" if lang == 'zh' else "Fee Income", f"${df_filtered['Fee'].sum():,.2f}")
+st.sidebar.metric("卡片销售数量" if lang == 'zh' else "Card Sales", totals['count'])
+st.sidebar.metric("卡片总面值" if lang == 'zh' else "Total Card Value", f"${totals['card_value_sum']:,.0f}")
+st.sidebar.metric("实际收入" if lang == 'zh' else "Actual Revenue", f"${totals['amount_sum']:,.2f}")
+st.sidebar.metric("手续费收入" if lang == 'zh' else "Fee Income", f"${totals['fee_sum']:,.2f}")
 
 # ===================== 主面板 =====================
 
@@ -1006,16 +1241,16 @@ with col1:
     st.metric(get_text('total_cards', lang), f"{len(df_valid):,} {get_text('cards', lang)}")
 
 with col2:
-    st.metric(get_text('card_value_sum', lang), f"${df_filtered['Card_Value'].sum():,.0f}")
+    st.metric(get_text('card_value_sum', lang), f"${totals['card_value_sum']:,.0f}")
 
 with col3:
-    st.metric(get_text('total_revenue', lang), f"${df_filtered['Amount'].sum():,.2f}")
+    st.metric(get_text('total_revenue', lang), f"${totals['amount_sum']:,.2f}")
 
 with col4:
-    st.metric(get_text('total_fees', lang), f"${df_filtered['Fee'].sum():,.2f}")
+    st.metric(get_text('total_fees', lang), f"${totals['fee_sum']:,.2f}")
 
 with col5:
-    st.metric(get_text('avg_fee_rate', lang), f"{df_filtered['Fee_Percentage'].mean():.2f}%")
+    st.metric(get_text('avg_fee_rate', lang), f"{totals['fee_pct_mean']:.2f}%")
 
 # 数据说明
 if lang == 'zh':
@@ -1104,10 +1339,10 @@ st.markdown('<div id="1"></div>', unsafe_allow_html=True)
 st.header(get_text('chain_overview', lang))
 
 # 动态洞察摘要
-chain_stats = df_filtered.groupby('Chain').size()
-chain_leader = chain_stats.idxmax()
-chain_leader_pct = chain_stats.max() / len(df_filtered) * 100
-total_chains = len(chain_stats)
+by_chain = aggregates['by_chain']
+chain_leader = by_chain['Count'].idxmax()
+chain_leader_pct = by_chain['Count'].max() / totals['count'] * 100
+total_chains = len(by_chain)
 
 insight_text = f"""
 **📊 数据摘要与洞察**  
@@ -1126,19 +1361,16 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader(get_text('chain_card_sales', lang))
-    chain_cards = df_filtered.groupby('Chain').size().reset_index(name='Count')
+    chain_cards = by_chain['Count'].reset_index()
     chain_cards = chain_cards.sort_values('Count', ascending=False)
     
-    # 应用链品牌色
-    chain_color_map = get_chain_color_map(chain_cards['Chain'].tolist())
-    
     fig_chain_count = px.pie(
         chain_cards,
         values='Count',
         names='Chain',
         title=get_text('chain_sales_ratio', lang),
         color='Chain',
-        color_discrete_map=chain_color_map
+        color_discrete_map=CHAIN_COLOR_MAP  # 应用链品牌色
     )
     fig_chain_count.update_traces(textposition='inside', textinfo='percent+label+value')
     fig_chain_count.update_layout(
@@ -1152,19 +1384,16 @@ with col1:
 
 with col2:
     st.subheader(get_text('chain_revenue', lang))
-    chain_revenue = df_filtered.groupby('Chain')['Amount'].sum().reset_index()
+    chain_revenue = by_chain['Amount'].reset_index()
     chain_revenue = chain_revenue.sort_values('Amount', ascending=False)
     
-    # 应用链品牌色
-    chain_color_map = get_chain_color_map(chain_revenue['Chain'].tolist())
-    
     fig_chain_rev = px.pie(
         chain_revenue,
         values='Amount',
         names='Chain',
         title=get_text('chain_revenue_ratio', lang),
         color='Chain',
-        color_discrete_map=chain_color_map
+        color_discrete_map=CHAIN_COLOR_MAP  # 应用链品牌色
     )
     fig_chain_rev.update_traces(textposition='inside', textinfo='percent+label+value')
     fig_chain_rev.update_layout(
@@ -1179,12 +1408,7 @@ with col2:
 
 # 各链详细统计表
 st.subheader(get_text('chain_detailed_stats', lang))
-chain_stats = df_filtered.groupby('Chain').agg({
-    'Card_Value': ['count', 'sum'],
-    'Amount': 'sum',
-    'Fee': 'sum',
-    'Fee_Percentage': 'mean'
-}).round(2)
+chain_stats = by_chain[['Count', 'Card_Value', 'Amount', 'Fee', 'Fee_Percentage']].round(2)
 
 chain_stats.columns = ['卡片数量', '卡片总面值', '实际收入', '手续费收入', '平均手续费率(%)'] if lang == 'zh' else ['Card Count', 'Card Value Sum', 'Actual Revenue', 'Fee Income', 'Avg Fee Rate(%)']
 chain_stats = chain_stats.sort_values(chain_stats.columns[0], ascending=False)
@@ -1192,15 +1416,9 @@ st.dataframe(chain_stats, use_container_width=True)
 
 # 时间趋势
 st.subheader("📈 " + ("销售时间趋势" if lang == 'zh' else "Sales Trend Over Time"))
-df_filtered['Date'] = df_filtered['DateTime'].dt.date
-daily_stats = df_filtered.groupby(['Date', 'Chain']).agg({
-    'Card_Value': 'count',
-    'Amount': 'sum'
-}).reset_index()
-daily_stats.columns = ['Date', 'Chain', 'Cards_Count', 'Revenue']
+daily_summary = aggregates['by_date']
 
 fig_daily = go.Figure()
-daily_summary = daily_stats.groupby('Date').agg({'Cards_Count': 'sum', 'Revenue': 'sum'})
 
 # 添加每日卡片销量和收入
 fig_daily.add_trace(go.Scatter(
@@ -1239,11 +1457,11 @@ st.markdown('<div id="2"></div>', unsafe_allow_html=True)
 st.header(get_text('card_value_analysis', lang))
 
 # 动态洞察摘要
-value_stats = df_filtered.groupby('Card_Value').size()
-popular_value = value_stats.idxmax()
-popular_value_count = value_stats.max()
-popular_value_pct = popular_value_count / len(df_filtered) * 100
-value_types = len(value_stats)
+by_card_value = aggregates['by_card_value']
+popular_value = by_card_value['Count'].idxmax()
+popular_value_count = by_card_value['Count'].max()
+popular_value_pct = popular_value_count / totals['count'] * 100
+value_types = len(by_card_value)
 
 insight_text = f"""
 **📊 数据摘要与洞察**  
@@ -1262,7 +1480,7 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader(get_text('card_value_sales', lang))
-    card_value_counts = df_filtered.groupby('Card_Value').size().reset_index(name='Count')
+    card_value_counts = by_card_value['Count'].reset_index()
     card_value_counts['Card_Value'] = card_value_counts['Card_Value'].astype(str) + ' USD'
     
     fig_cv_count = px.bar(
@@ -1285,7 +1503,7 @@ with col1:
 
 with col2:
     st.subheader(get_text('card_value_revenue', lang))
-    card_value_revenue = df_filtered.groupby('Card_Value')['Amount'].sum().reset_index()
+    card_value_revenue = by_card_value['Amount'].reset_index()
     card_value_revenue['Card_Value'] = card_value_revenue['Card_Value'].astype(str) + ' USD'
     
     fig_cv_rev = px.bar(
@@ -1308,8 +1526,7 @@ with col2:
 
 # 各链各面值热力图
 st.subheader("🔥 " + ("各链各面值销量热力图" if lang == 'zh' else "Heatmap: Sales by Chain & Card Value"))
-heatmap_data = df_filtered.groupby(['Chain', 'Card_Value']).size().reset_index(name='Count')
-heatmap_pivot = heatmap_data.pivot(index='Chain', columns='Card_Value', values='Count').fillna(0)
+heatmap_pivot = aggregates['heatmap'].unstack('Card_Value', fill_value=0)
 
 fig_heatmap = px.imshow(
     heatmap_pivot,
@@ -1331,12 +1548,11 @@ st.markdown('<div id="3"></div>', unsafe_allow_html=True)
 st.header(get_text('asset_analysis', lang))
 
 # 动态洞察摘要
-df_target_assets = df_filtered[df_filtered['Asset'].isin(SUPPORTED_TOKENS)]
-if not df_target_assets.empty:
-    asset_stats = df_target_assets.groupby('Asset').size()
-    top_token = asset_stats.idxmax()
-    top_token_pct = asset_stats.max() / len(df_target_assets) * 100
-    tokens_used = len(asset_stats)
+by_asset = aggregates['by_asset']
+if not by_asset.empty:
+    top_token = by_asset['Count'].idxmax()
+    top_token_pct = by_asset['Count'].max() / by_asset['Count'].sum() * 100
+    tokens_used = len(by_asset)
     
     insight_text = f"""
     **📊 数据摘要与洞察**  
@@ -1354,7 +1570,7 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     st.subheader(get_text('asset_sales', lang))
-    asset_counts = df_target_assets.groupby('Asset').size().reset_index(name='Count')
+    asset_counts = by_asset['Count'].reset_index()
     asset_counts = asset_counts.sort_values('Count', ascending=False)
     
     fig_asset_count = px.bar(
@@ -1375,7 +1591,7 @@ with col1:
 
 with col2:
     st.subheader(get_text('asset_revenue', lang))
-    asset_revenue = df_target_assets.groupby('Asset')['Amount'].sum().reset_index()
+    asset_revenue = by_asset['Amount'].reset_index()
     asset_revenue = asset_revenue.sort_values('Amount', ascending=False)
     
     fig_asset_rev = px.bar(
@@ -1396,7 +1612,7 @@ with col2:
 
 with col3:
     st.subheader(get_text('asset_usage_ratio', lang))
-    asset_percentage = df_target_assets.groupby('Asset').size().reset_index(name='Count')
+    asset_percentage = by_asset['Count'].reset_index()
     
     fig_asset_pie = px.pie(
         asset_percentage,
@@ -1418,17 +1634,14 @@ st.subheader(get_text('asset_chain_distribution', lang))
 tab1, tab2 = st.tabs([get_text('transaction_count', lang), get_text('revenue_amount', lang)])
 
 with tab1:
-    asset_chain_counts = df_target_assets.groupby(['Asset', 'Chain']).size().reset_index(name='Count')
-    
-    # 应用链品牌色
-    chain_color_map = get_chain_color_map(asset_chain_counts['Chain'].unique().tolist())
+    asset_chain_counts = aggregates['by_asset_chain']['Count'].reset_index()
     
     fig_ac = px.bar(
         asset_chain_counts,
         x='Asset',
         y='Count',
         color='Chain',
-        color_discrete_map=chain_color_map,
+        color_discrete_map=CHAIN_COLOR_MAP,  # 应用链品牌色
         title='Transactions by Asset & Chain' if lang == 'en' else '各代币在不同链上的交易笔数',
         barmode='group',
         text='Count'
@@ -1445,17 +1658,14 @@ with tab1:
     st.dataframe(pivot_ac, use_container_width=True)
 
 with tab2:
-    asset_chain_revenue = df_target_assets.groupby(['Asset', 'Chain'])['Amount'].sum().reset_index()
-    
-    # 应用链品牌色
-    chain_color_map = get_chain_color_map(asset_chain_revenue['Chain'].unique().tolist())
+    asset_chain_revenue = aggregates['by_asset_chain']['Amount'].reset_index()
     
     fig_acr = px.bar(
         asset_chain_revenue,
         x='Asset',
         y='Amount',
         color='Chain',
-        color_discrete_map=chain_color_map,
+        color_discrete_map=CHAIN_COLOR_MAP,  # 应用链品牌色
         title='Revenue by Asset & Chain' if lang == 'en' else '各代币在不同链上的收入金额',
         barmode='group',
         text='Amount'
@@ -1478,9 +1688,9 @@ st.markdown('<div id="4"></div>', unsafe_allow_html=True)
 st.header(get_text('fee_analysis', lang))
 
 # 动态洞察摘要
-total_fees_sum = df_filtered['Fee'].sum()
-avg_fee = df_filtered['Fee'].mean()
-avg_fee_rate = df_filtered['Fee_Percentage'].mean()
+total_fees_sum = totals['fee_sum']
+avg_fee = totals['fee_mean']
+avg_fee_rate = totals['fee_pct_mean']
 
 insight_text = f"""
 **📊 数据摘要与洞察**  
@@ -1499,21 +1709,23 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader(get_text('fee_rate_distribution', lang))
-    fig_fee_dist = px.histogram(
-        df_filtered,
-        x='Fee_Percentage',
-        nbins=50,
+    hist_counts, hist_edges = aggregates['fee_pct_hist']
+    fig_fee_dist = go.Figure(go.Bar(
+        x=(hist_edges[:-1] + hist_edges[1:]) / 2,
+        y=hist_counts,
+        width=np.diff(hist_edges) * 0.9,  # 柱宽取箱宽的90%，保留柱间空隙
+        marker_color='lightblue'
+    ))
+    fig_fee_dist.update_layout(
         title='Fee Rate Distribution' if lang == 'en' else '手续费率分布',
-        labels={'Fee_Percentage': 'Fee Rate (%)' if lang == 'en' else '手续费率 (%)', 
-                'count': 'Transaction Count' if lang == 'en' else '交易数量'},
-        color_discrete_sequence=['lightblue']
+        xaxis_title='Fee Rate (%)' if lang == 'en' else '手续费率 (%)',
+        yaxis_title='Transaction Count' if lang == 'en' else '交易数量'
     )
-    fig_fee_dist.update_layout(bargap=0.1)
     st.plotly_chart(fig_fee_dist, use_container_width=True)
     
-    st.metric(get_text('min_fee_rate', lang), f"{df_filtered['Fee_Percentage'].min():.2f}%")
-    st.metric(get_text('max_fee_rate', lang), f"{df_filtered['Fee_Percentage'].max():.2f}%")
-    st.metric(get_text('median_fee_rate', lang), f"{df_filtered['Fee_Percentage'].median():.2f}%")
+    st.metric(get_text('min_fee_rate', lang), f"{totals['fee_pct_min']:.2f}%")
+    st.metric(get_text('max_fee_rate', lang), f"{totals['fee_pct_max']:.2f}%")
+    st.metric(get_text('median_fee_rate', lang), f"{totals['fee_pct_median']:.2f}%")
     
     # 添加手续费率说明
     if lang == 'zh':
@@ -1547,19 +1759,16 @@ with col1:
 
 with col2:
     st.subheader(get_text('chain_avg_fee_rate', lang))
-    chain_fee = df_filtered.groupby('Chain')['Fee_Percentage'].mean().reset_index()
+    chain_fee = by_chain['Fee_Percentage'].reset_index()
     chain_fee = chain_fee.sort_values('Fee_Percentage', ascending=False)
     
-    # 应用链品牌色
-    chain_color_map = get_chain_color_map(chain_fee['Chain'].tolist())
-    
     fig_chain_fee = px.bar(
         chain_fee,
         x='Chain',
         y='Fee_Percentage',
         title='Avg Fee Rate by Chain' if lang == 'en' else '各链平均手续费率',
         color='Chain',
-        color_discrete_map=chain_color_map,
+        color_discrete_map=CHAIN_COLOR_MAP,  # 应用链品牌色
         text='Fee_Percentage'
     )
     fig_chain_fee.update_traces(texttemplate='%{text:.2f}%', textposition='outside')
@@ -1647,6 +1856,9 @@ if df_vip is not None and len(df_vip) > 0:
     # 活动开始日期
     activity_start = pd.to_datetime('2025-07-21')
     df_vip_after = df_vip[df_vip['After_2025-07-21'] == True]
+    # 折扣状态和快照匹配的笔数各统计一次，后面的指标、摘要和图表共用
+    vip_status_counts = df_vip_after['Status'].value_counts()
+    vip_snapshot_counts = df_vip_after['In_Snapshot'].value_counts()
     
     # 总体统计
     st.subheader(get_text('vip_summary', lang))
@@ -1658,7 +1870,7 @@ if df_vip is not None and len(df_vip) > 0:
     
     # 计算折扣享受率
     if len(df_vip_after) > 0:
-        enjoyed_count = len(df_vip_after[df_vip_after['Status'] == '✅已享受'])
+        enjoyed_count = vip_status_counts.get('✅已享受', 0)
         discount_rate = enjoyed_count / len(df_vip_after) * 100
     else:
         discount_rate = 0
@@ -1682,11 +1894,11 @@ if df_vip is not None and len(df_vip) > 0:
     # 计算关键指标
     if len(df_vip_after) > 0:
         # 先计算所有需要的变量
-        in_snapshot = len(df_vip_after[df_vip_after['In_Snapshot'] == True])
-        not_in_snap = len(df_vip_after[df_vip_after['In_Snapshot'] == False])
+        in_snapshot = vip_snapshot_counts.get(True, 0)
+        not_in_snap = vip_snapshot_counts.get(False, 0)
         not_in_snapshot = not_in_snap  # 别名，用于后面的代码
-        enjoyed = len(df_vip_after[df_vip_after['Status'] == '✅已享受'])
-        not_enjoyed = len(df_vip_after[df_vip_after['Status'] == '❌未享受'])
+        enjoyed = vip_status_counts.get('✅已享受', 0)
+        not_enjoyed = vip_status_counts.get('❌未享受', 0)
         
         # 计算百分比
         in_snapshot_pct = in_snapshot / len(df_vip_after) * 100
@@ -1923,7 +2135,7 @@ if df_vip is not None and len(df_vip) > 0:
             # 折扣享受情况
             st.markdown(f"**{get_text('vip_discount_status', lang)}**")
             
-            not_in_snap_status = len(df_vip_after[df_vip_after['Status'] == '❓不在快照'])
+            not_in_snap_status = vip_status_counts.get('❓不在快照', 0)
             
             discount_data = pd.DataFrame({
                 'Status': [get_text('vip_enjoyed', lang), get_text('vip_not_enjoyed', lang), get_text('vip_not_in_snapshot', lang)],
@@ -1956,7 +2168,7 @@ if df_vip is not None and len(df_vip) > 0:
     
     with col1:
         st.subheader(get_text('vip_by_chain', lang))
-        chain_stats = df_vip.groupby('Chain').agg({
+        chain_stats = df_vip.groupby('Chain', observed=True).agg({
             'Card_Value': 'count',
             'Actual_Paid': 'sum',
             'VIP_Discount': 'sum'
@@ -1983,7 +2195,7 @@ if df_vip is not None and len(df_vip) > 0:
     
     with col2:
         st.subheader(get_text('vip_by_card_value', lang))
-        value_stats = df_vip.groupby('Card_Value').size().reset_index(name='Count')
+        value_stats = df_vip['Card_Value'].value_counts(sort=False).sort_index().rename_axis('Card_Value').reset_index(name='Count')
         value_stats['Card_Value'] = value_stats['Card_Value'].astype(str) + ' USD'
         
         fig_vip_value = px.pie(
@@ -2123,7 +2335,7 @@ if not df_refund.empty:
     # 时间趋势图
     st.markdown("### " + get_text('refund_trend', lang))
     df_refund_daily = df_refund.copy()
-    df_refund_daily['Date'] = df_refund_daily['DateTime'].dt.date
+    df_refund_daily['Date'] = df_refund_daily['DateTime'].dt.normalize()
     daily_stats = df_refund_daily.groupby('Date').agg({
         'Amount': ['sum', 'count']
     }).reset_index()